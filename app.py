@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import os
 from datetime import date, datetime, timedelta
 
+from dashboard.projects import Project, baseline_documents, load_registry, project_dir
+from dashboard import timing
+from dashboard.timing import stage
+
 # =============================================
 # KONFIGURASI HALAMAN
 # =============================================
@@ -17,323 +19,148 @@ st.set_page_config(
 # =============================================
 # CUSTOM CSS
 # =============================================
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    html, body, [class*="css"] {
-        font-size: 16px;
-    }
-    
-    .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 1400px;
-    }
-    
-    .main {
-        background-color: #FFFFFF;
-    }
-    
-    [data-testid="stSidebar"] {
-        background-color: #F8FAFC;
-        border-right: 1px solid #E2E8F0;
-    }
-    
-    .dashboard-header {
-        background: #FFFFFF;
-        padding: 1.5rem 0;
-        margin-bottom: 2rem;
-        border-bottom: 2px solid #F1F5F9;
-    }
-    
-    .dashboard-header h1 {
-        margin: 0;
-        font-size: 2.25rem;
-        font-weight: 700;
-        color: #0F172A;
-    }
-    
-    .dashboard-header p {
-        margin: 0.5rem 0 0 0;
-        font-size: 1.125rem;
-        color: #64748B;
-    }
-    
-    .kpi-card {
-        background: #FFFFFF;
-        padding: 1.5rem;
-        border-radius: 8px;
-        border: 1px solid #E2E8F0;
-        height: 100%;
-    }
-    
-    .kpi-card:hover {
-        border-color: #CBD5E1;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.06);
-    }
-    
-    .kpi-label {
-        font-size: 0.9rem;
-        color: #64748B;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-        margin-bottom: 0.5rem;
-    }
-    
-    .kpi-value {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #0F172A;
-        line-height: 1.1;
-        margin-bottom: 0.5rem;
-    }
-    
-    .kpi-change {
-        font-size: 0.95rem;
-        font-weight: 500;
-        color: #64748B;
-    }
-    
-    .kpi-change.positive { color: #059669; }
-    .kpi-change.negative { color: #DC2626; }
-    
-    .section-title {
-        font-size: 1.25rem;
-        font-weight: 600;
-        color: #0F172A;
-        margin: 2.5rem 0 1.25rem 0;
-        padding-bottom: 0.75rem;
-        border-bottom: 1px solid #F1F5F9;
-    }
-    
-    .chart-container {
-        background: #FFFFFF;
-        padding: 1.5rem;
-        border-radius: 8px;
-        border: 1px solid #E2E8F0;
-        margin-bottom: 1rem;
-    }
-    
-    .chart-header {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #0F172A;
-        margin-bottom: 1rem;
-    }
-    
-    .alert {
-        padding: 1rem 1.25rem;
-        border-radius: 6px;
-        margin: 0.75rem 0;
-        font-size: 1rem;
-        border-left: 4px solid;
-        line-height: 1.5;
-    }
-    
-    .alert-success {
-        background: #F0FDF4;
-        border-left-color: #10B981;
-        color: #065F46;
-    }
-    
-    .alert-warning {
-        background: #FFFBEB;
-        border-left-color: #F59E0B;
-        color: #92400E;
-    }
-    
-    .alert-error {
-        background: #FEF2F2;
-        border-left-color: #EF4444;
-        color: #991B1B;
-    }
-    
-    .alert-info {
-        background: #F0F9FF;
-        border-left-color: #3B82F6;
-        color: #1E40AF;
-    }
-    
-    .progress-container {
-        margin: 1.25rem 0;
-    }
-    
-    .progress-header {
-        display: flex;
-        justify-content: space-between;
-        margin-bottom: 0.75rem;
-        font-size: 1.05rem;
-        color: #475569;
-        font-weight: 500;
-    }
-    
-    .progress-bar-bg {
-        height: 12px;
-        background: #F1F5F9;
-        border-radius: 6px;
-        overflow: hidden;
-    }
-    
-    .progress-bar-fill {
-        height: 100%;
-        background: #0F172A;
-        border-radius: 6px;
-    }
-    
-    .filter-section {
-        background: #F8FAFC;
-        padding: 1.25rem;
-        border-radius: 6px;
-        margin-bottom: 1.5rem;
-        border: 1px solid #E2E8F0;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0;
-        background: transparent;
-        border-bottom: 1px solid #E2E8F0;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        border: none;
-        color: #64748B;
-        font-weight: 500;
-        padding: 1rem 1.75rem;
-        font-size: 1.05rem;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        color: #0F172A;
-        border-bottom: 2px solid #0F172A;
-    }
-    
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    .stDeployButton {display:none;}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def page_css():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard", "style.css")) as f:
+        return f"<style>\n{f.read()}</style>"
 
-# =============================================
-# COLOR PALETTE
-# =============================================
-COLORS = {
-    'primary': '#0F172A',
-    'success': '#10B981',
-    'warning': '#F59E0B',
-    'danger': '#EF4444',
-    'neutral': '#64748B',
-}
-
-STATUS_COLORS = {
-    "Selesai": COLORS['success'],
-    "Proses": COLORS['warning'],
-    "Belum": COLORS['neutral']
-}
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # =============================================
 # DATA CONFIGURATION
 # =============================================
-LOG_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vTEpBx0Eg1x3unaxVVQWJVFfzmH9Z8qKQPevp87cnsfP-nhyNYfhQvVc3Vpd0sDfkNRaNs7R4VH1nOa/pub?gid=1285157492&single=true&output=csv"
+LOG_URL = os.environ.get("DASHBOARD_LOG_URL", "https://docs.google.com/spreadsheets/d/e/2PACX-1vTEpBx0Eg1x3unaxVVQWJVFfzmH9Z8qKQPevp87cnsfP-nhyNYfhQvVc3Vpd0sDfkNRaNs7R4VH1nOa/pub?gid=1285157492&single=true&output=csv")
 PROJECT_START = date(2025, 11, 10)
-STATUS_ORDER = ["Belum", "Proses", "Selesai"]
+PROJECT_WEEKS = 12
+REFRESH_INTERVAL = 60
+IDLE_TIMEOUT = 15 * 60
+# Local log files are re-checked (a stat) this often instead of REFRESH_INTERVAL.
+WATCH_INTERVAL = float(os.environ.get("DASHBOARD_WATCH_INTERVAL", "1"))
+# Open sessions check their project's snapshot version this often and rerun
+# only when it changed; 0 turns live updates off.
+LIVE_INTERVAL = float(os.environ.get("DASHBOARD_LIVE_INTERVAL", "2"))
+# Port for POST /append/<project> (dashboard/ingest.py); unset disables it.
+INGEST_PORT = os.environ.get("DASHBOARD_INGEST_PORT")
+# Cost and risk sheets are fetched together; one that takes longer than this
+# keeps its last good copy until the next refresh.
+SOURCE_TIMEOUT = float(os.environ.get("DASHBOARD_SOURCE_TIMEOUT", "10"))
+SHEET_LABELS = {"costs": "Cost log", "risks": "Risk log"}
+DERIVED_CACHE_ENTRIES = 64
+FIGURE_CACHE_ENTRIES = 128
+ALERT_LIMIT = 20
+# Lazy tabs: only the selected tab's block runs on a rerun. Set
+# DASHBOARD_LAZY_TABS=0 to run every tab each time (plain st.tabs).
+LAZY_TABS = os.environ.get("DASHBOARD_LAZY_TABS", "1") != "0"
 
 BASELINE = [
-    {"document": "Project Charter", "phase": "Inisiasi", "pic_role": "PM", "target_week": 1},
-    {"document": "Gantt Chart / Schedule", "phase": "Perencanaan", "pic_role": "PM", "target_week": 2},
-    {"document": "SRS", "phase": "Perencanaan", "pic_role": "BA/SA", "target_week": 3},
-    {"document": "Use Case Diagram + Deskripsi", "phase": "Perencanaan", "pic_role": "BA/SA", "target_week": 4},
-    {"document": "ERD + Data Dictionary", "phase": "Perencanaan", "pic_role": "Backend/DB", "target_week": 5},
-    {"document": "Wireframe / Mockup UI", "phase": "Perencanaan", "pic_role": "UI/UX", "target_week": 6},
-    {"document": "Risk Register", "phase": "Controlling", "pic_role": "PM", "target_week": 6},
-    {"document": "User Manual", "phase": "Penutupan", "pic_role": "BA/SA", "target_week": 11},
+    {"document": "Project Charter", "phase": "Inisiasi", "pic_role": "PM", "target_week": 1, "start_week": 1, "budget": 40000},
+    {"document": "Gantt Chart / Schedule", "phase": "Perencanaan", "pic_role": "PM", "target_week": 2, "start_week": 2, "budget": 40000},
+    {"document": "SRS", "phase": "Perencanaan", "pic_role": "BA/SA", "target_week": 3, "start_week": 2, "budget": 50000},
+    {"document": "Use Case Diagram + Deskripsi", "phase": "Perencanaan", "pic_role": "BA/SA", "target_week": 4, "start_week": 3, "budget": 50000},
+    {"document": "ERD + Data Dictionary", "phase": "Perencanaan", "pic_role": "Backend/DB", "target_week": 5, "start_week": 4, "budget": 60000},
+    {"document": "Wireframe / Mockup UI", "phase": "Perencanaan", "pic_role": "UI/UX", "target_week": 6, "start_week": 4, "budget": 60000},
+    {"document": "Risk Register", "phase": "Controlling", "pic_role": "PM", "target_week": 6, "start_week": 1, "budget": 50000},
+    {"document": "User Manual", "phase": "Penutupan", "pic_role": "BA/SA", "target_week": 11, "start_week": 7, "budget": 150000},
+]
+
+# Built-in risk log, used by projects without a ``risk_url``.
+RISKS = [
+    {"ID": "R1", "Risiko": "Requirement berubah-ubah", "Probabilitas": "Tinggi", "Dampak": "Sedang", "Strategi": "Mitigasi", "Status": "Open"},
+    {"ID": "R2", "Risiko": "Deadline tidak tercapai", "Probabilitas": "Sedang", "Dampak": "Tinggi", "Strategi": "Mitigasi", "Status": "Open"},
+    {"ID": "R3", "Risiko": "Skill tim kurang memadai", "Probabilitas": "Sedang", "Dampak": "Tinggi", "Strategi": "Mitigasi", "Status": "Mitigated"},
+    {"ID": "R4", "Risiko": "Anggota tim berhalangan", "Probabilitas": "Sedang", "Dampak": "Sedang", "Strategi": "Acceptance", "Status": "Open"},
+    {"ID": "R5", "Risiko": "Server down saat demo", "Probabilitas": "Rendah", "Dampak": "Tinggi", "Strategi": "Transfer", "Status": "Mitigated"},
+    {"ID": "R6", "Risiko": "Data/code hilang", "Probabilitas": "Rendah", "Dampak": "Tinggi", "Strategi": "Avoidance", "Status": "Mitigated"},
 ]
 
+DEFAULT_PROJECT = Project("office-supplies", "Office Supplies Management System", PROJECT_START, LOG_URL, BASELINE,
+                          os.environ.get("DASHBOARD_COST_URL"), os.environ.get("DASHBOARD_RISK_URL"))
+
 # =============================================
 # HELPER FUNCTIONS
 # =============================================
-def normalize_columns(df):
-    df = df.copy()
-    df.columns = [c.strip().lower() for c in df.columns]
-    rename_map = {
-        "week": "week_no", "mingguke": "week_no", "minggu_ke": "week_no",
-        "doc": "document", "nama dokumen": "document",
-        "fase": "phase", "pic": "pic_role", "role": "pic_role",
-        "updatedby": "updated_by", "catatan": "notes",
-    }
-    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-    return df
-
-@st.cache_data(ttl=60)
-def load_log(url):
-    df = pd.read_csv(url)
-    df = normalize_columns(df)
-    required = {"timestamp", "week_no", "document", "status", "progress"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing columns: {missing}")
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    if "week_start" in df.columns:
-        df["week_start"] = pd.to_datetime(df["week_start"], errors="coerce")
-    df["week_no"] = pd.to_numeric(df["week_no"], errors="coerce")
-    df["progress"] = pd.to_numeric(df["progress"], errors="coerce")
-    df["status"] = df["status"].astype(str).str.strip().str.title()
-    df.loc[~df["status"].isin(STATUS_ORDER), "status"] = "Proses"
-    df["document"] = df["document"].astype(str).str.strip()
-    return df.dropna(subset=["week_no", "document"])
+@st.cache_resource
+def get_registry():
+    return load_registry(DEFAULT_PROJECT)
+
+@st.cache_resource
+def get_live_refreshers():
+    # project key -> Refresher, for the ingest thread (which can't call st caches).
+    return {}
+
+@st.cache_resource
+def get_refresher(project_key):
+    project = get_registry()[project_key]
+    store = LogStore(project.log_url, root=project_dir(project_key), documents=baseline_documents(project))
+    interval = REFRESH_INTERVAL if local_path(project.log_url) is None else WATCH_INTERVAL
+    refresher = Refresher(store, interval=interval, idle_timeout=IDLE_TIMEOUT).start()
+    get_live_refreshers()[project_key] = refresher
+    return refresher
+
+@st.cache_resource
+def get_ingest_server():
+    registry, refreshers = get_registry(), get_live_refreshers()
+
+    def resolve(key):
+        return local_path(registry[key].log_url) if key in registry else None
+
+    def on_append(key, start, stop):
+        if key in refreshers:
+            # Only appended: the store can skip re-hashing everything before ``start``.
+            refreshers[key].store.appended(start, stop)
+            refreshers[key].poll_now()
+
+    return start_ingest_server(resolve, on_append, port=int(INGEST_PORT))
+
+@st.fragment(run_every=LIVE_INTERVAL or None)
+def live_updates(project_key, seen_version):
+    # Runs alone every LIVE_INTERVAL; the full script only reruns on new data.
+    snapshot = get_refresher(project_key).get(timeout=0)
+    if snapshot is not None and snapshot.frame is not None and snapshot.version != seen_version:
+        st.rerun()
+
+def load_log(project_key):
+    snapshot = get_refresher(project_key).get(timeout=FETCH_TIMEOUT)
+    if snapshot is None:
+        raise TimeoutError("log source did not respond")
+    if snapshot.frame is None:
+        raise snapshot.error
+    return snapshot
+
+def format_age(snapshot):
+    if snapshot.checked_at is None:
+        return "cached copy, refreshing…"
+    return format_since(snapshot.checked_at)
+
+def format_since(timestamp):
+    seconds = max(0, int(datetime.now().timestamp() - timestamp))
+    if seconds < 60:
+        return f"updated {seconds}s ago"
+    if seconds < 3600:
+        return f"updated {seconds // 60}m ago"
+    return f"updated {seconds // 3600}h ago"
 
 def compute_current_week(project_start):
     today = date.today()
     delta_days = (today - project_start).days
     if delta_days < 0:
         return 1
-    return min(12, max(1, delta_days // 7 + 1))
+    return min(PROJECT_WEEKS, max(1, delta_days // 7 + 1))
 
-def get_latest_status(df_log, df_baseline):
-    if len(df_log) > 0:
-        df_latest = (df_log.sort_values("timestamp", ascending=True)
-                    .groupby("document", as_index=False).tail(1))
-    else:
-        df_latest = pd.DataFrame(columns=["document", "status", "progress"])
-    
-    df_result = df_baseline.copy()
-    
-    if len(df_latest) > 0:
-        log_cols = ["document"]
-        for col in ["status", "progress", "timestamp", "notes", "updated_by", "week_no"]:
-            if col in df_latest.columns:
-                log_cols.append(col)
-        
-        df_log_subset = df_latest[log_cols].copy()
-        rename_dict = {col: f"{col}_log" for col in log_cols if col != "document"}
-        df_log_subset = df_log_subset.rename(columns=rename_dict)
-        
-        df_result = df_result.merge(df_log_subset, on="document", how="left")
-        df_result["status"] = df_result.get("status_log", "Belum").fillna("Belum")
-        df_result["progress"] = df_result.get("progress_log", 0).fillna(0)
-        
-        if "timestamp_log" in df_result.columns:
-            df_result["timestamp"] = df_result["timestamp_log"]
-        if "notes_log" in df_result.columns:
-            df_result["notes"] = df_result["notes_log"]
-        if "updated_by_log" in df_result.columns:
-            df_result["updated_by"] = df_result["updated_by_log"]
-        
-        cols_to_drop = [c for c in df_result.columns if c.endswith("_log")]
-        df_result = df_result.drop(columns=cols_to_drop, errors="ignore")
-    else:
-        df_result["status"] = "Belum"
-        df_result["progress"] = 0
-    
-    return df_result
+# Static tables are built once per process and shared (not copied) across reruns;
+# callers must not mutate them.
+@st.cache_resource
+def load_baseline(project_key):
+    project = get_registry()[project_key]
+    df_baseline = pd.DataFrame(project.baseline)
+    # Same document order the log store seeds its dictionary with.
+    df_baseline["document"] = pd.Categorical(df_baseline["document"], categories=baseline_documents(project))
+    df_baseline["phase"] = df_baseline["phase"].astype("category")
+    df_baseline["pic_role"] = df_baseline["pic_role"].astype("category")
+    df_baseline["target_date"] = pd.Timestamp(project.start) + pd.to_timedelta((df_baseline["target_week"] - 1) * 7, unit="D")
+    return df_baseline
 
-@st.cache_data
+@st.cache_resource
 def load_tim():
     return pd.DataFrame({
         'Role': ['PM', 'BA/SA', 'UI/UX', 'Backend/DB'],
@@ -342,27 +169,98 @@ def load_tim():
                   'Figma, CSS, User Research', 'Database, SQL, Python/Laravel']
     })
 
-@st.cache_data
-def load_risiko():
-    return pd.DataFrame({
-        'ID': ['R1', 'R2', 'R3', 'R4', 'R5', 'R6'],
-        'Risiko': ['Requirement berubah-ubah', 'Deadline tidak tercapai', 'Skill tim kurang memadai',
-                   'Anggota tim berhalangan', 'Server down saat demo', 'Data/code hilang'],
-        'Probabilitas': ['Tinggi', 'Sedang', 'Sedang', 'Sedang', 'Rendah', 'Rendah'],
-        'Dampak': ['Sedang', 'Tinggi', 'Tinggi', 'Sedang', 'Tinggi', 'Tinggi'],
-        'Skor': [6, 6, 6, 4, 4, 4],
-        'Strategi': ['Mitigasi', 'Mitigasi', 'Mitigasi', 'Acceptance', 'Transfer', 'Avoidance'],
-        'Status': ['Open', 'Open', 'Mitigated', 'Open', 'Mitigated', 'Mitigated']
-    })
+@st.cache_resource
+def get_sheet_sources(project_key):
+    project = get_registry()[project_key]
+    urls = {"costs": project.cost_url, "risks": project.risk_url}
+    sources = SourceSet({name: url for name, url in urls.items() if url},
+                        {"costs": parse_costs, "risks": parse_risks}, timeout=SOURCE_TIMEOUT)
+    return sources.start(REFRESH_INTERVAL, idle_timeout=IDLE_TIMEOUT)
 
-@st.cache_data
-def load_evm():
-    return pd.DataFrame({
-        'Minggu': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-        'PV': [40000, 80000, 130000, 180000, 240000, 300000, 360000, 410000, 450000, 480000, 500000, 500000],
-        'EV': [40000, 75000, 125000, 170000, 230000, 290000, 0, 0, 0, 0, 0, 0],
-        'AC': [45000, 85000, 140000, 195000, 260000, 330000, 0, 0, 0, 0, 0, 0]
-    })
+def load_sheets(project_key, timeout=SOURCE_TIMEOUT):
+    """``{name: SourceResult}`` for the project's cost/risk sheets, refreshed in the
+    background; None if the first refresh isn't in within ``timeout``."""
+    return get_sheet_sources(project_key).get(timeout)
+
+def sheet_value(project_key, name):
+    """(updated_at, value) of a sheet, (None, None) if the project has none."""
+    results = load_sheets(project_key)
+    if results is None:
+        raise TimeoutError(f"no response within {SOURCE_TIMEOUT:g}s")
+    result = results.get(name)
+    if result is None:
+        return None, None
+    if result.value is None:
+        raise result.error
+    return result.updated_at, result.value
+
+@st.cache_resource
+def load_builtin_risks():
+    return normalize_risks(pd.DataFrame(RISKS))
+
+def load_risk_log(project_key):
+    """(updated_at, risk log) from the project's risk sheet, else the built-in ``RISKS``."""
+    if not get_registry()[project_key].risk_url:
+        return None, load_builtin_risks()
+    return sheet_value(project_key, "risks")
+
+@st.cache_resource
+def get_export_pool():
+    return export_pool()
+
+@st.cache_resource
+def get_risk_register(project_key):
+    return RiskRegister()
+
+def load_costs(project_key):
+    """(updated_at, cost log) for projects with a cost sheet, else (None, None)."""
+    return sheet_value(project_key, "costs")
+
+def build_document_summary(df_log, latest_rows, df_baseline):
+    with stage("get_latest_status"):
+        df_dokumen = get_latest_status(df_log, latest_rows, df_baseline)
+    with stage("summarize_documents"):
+        return summarize_documents(df_dokumen, load_tim()["Role"].tolist())
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def derive_documents(project_key, log_version, _df_log, _latest_rows, _df_baseline):
+    return build_document_summary(_df_log, _latest_rows, _df_baseline)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def derive_documents_as_of(project_key, log_version, week, _df_log, _history, _df_baseline):
+    """Document summary replayed to the end of ``week``."""
+    week_end = datetime.combine(get_registry()[project_key].start, datetime.min.time()) + timedelta(weeks=week)
+    with stage("history.as_of"):
+        latest_rows = _history.positions_as_of(week_end)
+    return build_document_summary(_df_log, latest_rows, _df_baseline)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def derive_week(project_key, log_version, week, replay, _df_dokumen):
+    return summarize_week(_df_dokumen, week)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def derive_evm(project_key, log_version, costs_at, granularity, weeks, _df_log, _df_baseline, _df_costs):
+    df_costs = _df_costs if _df_costs is not None else costs_from_log(_df_log)
+    return compute_evm(_df_baseline, _df_log, df_costs, get_registry()[project_key].start, weeks, granularity)
+
+@st.cache_resource(max_entries=DERIVED_CACHE_ENTRIES)
+def derive_forecast(project_key, log_version, _df_log, _df_baseline):
+    with stage("forecast"):
+        return forecast_completion(_df_baseline, _df_log, get_registry()[project_key].start)
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+def cached_figure(kind, content_key, _data, **params):
+    return BUILDERS[kind](*_data, **params)
+
+def figure(kind, *data, **params):
+    # Keyed on the aggregates' content: an unchanged chart comes back as the same figure.
+    return cached_figure(kind, content_hash(*data), data, **params)
+
+def derive_risks(project_key, df_risks):
+    # Only rows appended since the register last synced are scored and counted;
+    # an unchanged log returns the register's last view, so there's nothing to cache here.
+    with stage("risks.sync"):
+        return get_risk_register(project_key).sync(df_risks)
 
 # =============================================
 # UI COMPONENTS
@@ -383,6 +281,10 @@ def kpi_card(label, value, change=None):
 def alert_box(message, alert_type="info"):
     return f'<div class="alert alert-{alert_type}">{message}</div>'
 
+def alert_boxes(messages, alert_type="info"):
+    """``alert_box`` over a Series of messages, joined into one HTML string."""
+    return (f'<div class="alert alert-{alert_type}">' + messages + '</div>').str.cat()
+
 def progress_bar(label, current, total):
     pct = (current / total * 100) if total > 0 else 0
     return f'''
@@ -397,381 +299,509 @@ def progress_bar(label, current, total):
     </div>
     '''
 
+def download_buttons(name, make_chunks, key):
+    # Deferred: the file is only built when a button is clicked, on the shared export pool
+    # so concurrent downloads across sessions queue instead of all converting at once.
+    pool = get_export_pool()
+    columns = st.columns([1, 1, 4])
+    for column, fmt, label in ((columns[0], "csv", "⬇️ CSV"), (columns[1], "xlsx", "⬇️ Excel")):
+        with column:
+            st.download_button(label, lambda fmt=fmt: export_table(pool, fmt, make_chunks, name),
+                               file_name=f"{name}{FORMATS[fmt][1]}", mime=FORMATS[fmt][0],
+                               key=f"{key}_{fmt}", on_click="ignore")
+
+def tab_open(tab):
+    # .open is None when tabs don't track state (eager mode).
+    return tab.open is not False
+
+# Streamlit drops a widget's state on every run that doesn't render it, which
+# with lazy tabs is every run spent on another tab. Widgets inside tabs mirror
+# their value to a plain session_state key on change and read it back as their default.
+def kept(key, default):
+    return st.session_state.get(f"kept_{key}", default)
+
+def keep(key):
+    st.session_state[f"kept_{key}"] = st.session_state[key]
+
+def kept_options(key, options, default):
+    # Multiselect defaults must still be among the (possibly changed) options.
+    return [o for o in kept(key, default) if o in options]
+
 # =============================================
 # LOAD DATA
 # =============================================
-st.markdown("""
-<div class="dashboard-header">
-    <h1>📊 Project Monitoring Dashboard</h1>
-    <p>Office Supplies Management System — Real-time project tracking</p>
-</div>
-""", unsafe_allow_html=True)
+registry = get_registry()
 
 with st.sidebar:
     st.markdown("### ⚙️ Settings")
     st.markdown("---")
-    auto_week = compute_current_week(PROJECT_START)
+    if len(registry) > 1:
+        project_key = st.selectbox("📁 Project", list(registry), format_func=lambda k: registry[k].name, key="project")
+    else:
+        project_key = DEFAULT_PROJECT.key
+    project = registry[project_key]
+    auto_week = compute_current_week(project.start)
     st.info(f"**📅 Current Week:** {auto_week}")
-    st.caption(f"Project Start: {PROJECT_START.strftime('%d %b %Y')}")
+    st.caption(f"Project Start: {project.start.strftime('%d %b %Y')}")
+
+st.markdown(f"""
+<div class="dashboard-header">
+    <h1>📊 Project Monitoring Dashboard</h1>
+    <p>{project.name} — Real-time project tracking</p>
+</div>
+""", unsafe_allow_html=True)
+
+# Data and chart modules are imported once the header is on screen: pandas
+# alone is most of a fresh process's time to first paint.
+with stage("import"):
+    import pandas as pd
+
+    from dashboard.charts import BUILDERS, content_hash, PROGRESS_TOP_N, RISK_STATUS_COLORS, STATUS_COLORS
+    from dashboard.derived import get_latest_status, summarize_documents, summarize_week
+    from dashboard.evm import compute_evm, costs_from_log, parse_costs, period_at_week
+    from dashboard.export import FORMATS, evm_table, export_pool, export_table, iter_chunks
+    from dashboard.fetch import FETCH_TIMEOUT, local_path
+    from dashboard.forecast import forecast_completion
+    from dashboard.history import HistoryView
+    from dashboard.ingest import start_ingest_server
+    from dashboard.logstore import STATUS_ORDER, LogStore, WeekView
+    from dashboard.paging import PAGE_SIZE, LogPager, page_count, paginate
+    from dashboard.refresher import Refresher
+    from dashboard.risks import LEVELS, HIGH_SCORE, RISK_COLUMNS, RiskRegister, normalize_risks, parse_risks
+    from dashboard.sources import SourceSet
+
+if INGEST_PORT:
+    get_ingest_server()
 
 try:
-    df_log = load_log(LOG_URL)
+    with stage("load_log"):
+        snapshot = load_log(project_key)
+    df_log = snapshot.frame
+    latest_rows = snapshot.latest
+    log_weeks = snapshot.weeks
+    log_history = snapshot.history
+    log_version = snapshot.version
     data_loaded = True
     with st.sidebar:
         st.success(f"✅ {len(df_log)} records loaded")
+        st.caption(f"🕒 Snapshot {format_age(snapshot)}")
+        if snapshot.error is not None:
+            st.warning(f"⚠️ Refresh failed, showing last snapshot: {snapshot.error}")
 except Exception as e:
     st.warning(f"⚠️ Data load error: {str(e)}")
     df_log = pd.DataFrame(columns=["timestamp", "week_no", "document", "status", "progress"])
+    latest_rows = {}
+    log_weeks = WeekView()
+    log_history = HistoryView()
+    log_version = None
     data_loaded = False
 
-df_baseline = pd.DataFrame(BASELINE)
-df_baseline["target_date"] = df_baseline["target_week"].apply(lambda w: PROJECT_START + timedelta(days=(w - 1) * 7))
-df_dokumen = get_latest_status(df_log, df_baseline)
+with st.sidebar, stage("load_sheets"):
+    # Never waits: the tabs that use a sheet wait for it themselves.
+    sheets = load_sheets(project_key, timeout=0)
+    if sheets is None and get_sheet_sources(project_key).timeouts:
+        st.caption("🕒 Cost and risk sheets loading…")
+    for result in (sheets or {}).values():
+        label = SHEET_LABELS[result.name]
+        if not result.stale:
+            st.caption(f"🕒 {label} {format_since(result.fetched_at)}")
+        elif result.value is not None:
+            st.warning(f"⚠️ {label} refresh failed, showing copy {format_since(result.fetched_at)}: {result.error}")
+        else:
+            st.warning(f"⚠️ {label} unavailable: {result.error}")
+
+if LIVE_INTERVAL:
+    with st.sidebar:
+        live_updates(project_key, log_version)
+
+df_baseline = load_baseline(project_key)
+summary = derive_documents(project_key, log_version, df_log, latest_rows, df_baseline)
+df_dokumen = summary.documents
 df_tim = load_tim()
-df_risiko = load_risiko()
-df_evm = load_evm()
 
 # =============================================
 # TABS
 # =============================================
-tabs = st.tabs(["📊 Overview", "👥 Team", "⚠️ Risk", "💰 EVM", "📄 Documents", "📝 Log"])
+tabs = st.tabs(
+    ["📊 Overview", "👥 Team", "⚠️ Risk", "💰 EVM", "📄 Documents", "📝 Log"],
+    key="tab",
+    on_change="rerun" if LAZY_TABS else "ignore",
+)
 
 # =============================================
 # TAB 1: OVERVIEW
 # =============================================
-with tabs[0]:
-    col_w, _ = st.columns([1, 3])
-    with col_w:
-        current_week = st.number_input("📅 Current Week", 1, 12, auto_week, key="week_overview")
-    
-    st.markdown("---")
-    
-    total = len(df_dokumen)
-    selesai = int((df_dokumen['status'] == 'Selesai').sum())
-    proses = int((df_dokumen['status'] == 'Proses').sum())
-    belum = int((df_dokumen['status'] == 'Belum').sum())
-    avg_progress = float(df_dokumen['progress'].mean())
-    df_dokumen["overdue"] = (current_week > df_dokumen["target_week"]) & (df_dokumen["status"] != "Selesai")
-    overdue = int(df_dokumen["overdue"].sum())
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    with col1:
-        st.markdown(kpi_card("Total Documents", total, "All deliverables"), unsafe_allow_html=True)
-    with col2:
-        st.markdown(kpi_card("Completed", selesai, f"✓ {selesai/total*100:.0f}% done"), unsafe_allow_html=True)
-    with col3:
-        st.markdown(kpi_card("In Progress", proses, f"{proses/total*100:.0f}% active"), unsafe_allow_html=True)
-    with col4:
-        st.markdown(kpi_card("Not Started", belum, f"{belum/total*100:.0f}% pending"), unsafe_allow_html=True)
-    with col5:
-        st.markdown(kpi_card("Overdue", overdue, "⚠️ Attention" if overdue > 0 else "✓ On track"), unsafe_allow_html=True)
-    
-    st.markdown('<div class="section-title">📈 Overall Progress</div>', unsafe_allow_html=True)
-    st.markdown(progress_bar("Project Completion", avg_progress, 100), unsafe_allow_html=True)
-    
-    st.markdown('<div class="section-title">📊 Analytics</div>', unsafe_allow_html=True)
-    
-    col_c1, col_c2 = st.columns(2)
-    
-    with col_c1:
-        st.markdown('<div class="chart-container"><div class="chart-header">Status Distribution</div>', unsafe_allow_html=True)
-        status_count = df_dokumen['status'].value_counts().reindex(STATUS_ORDER, fill_value=0)
+if tab_open(tabs[0]):
+    with tabs[0], stage("tab.overview"):
+        col_w, _ = st.columns([1, 3])
+        with col_w:
+            current_week = st.number_input("📅 Current Week", 1, PROJECT_WEEKS, kept("week_overview", auto_week),
+                                           key="week_overview", on_change=keep, args=("week_overview",))
+    
+        st.markdown("---")
+    
+        with stage("aggregate.overview"):
+            # Past weeks replay statuses as they stood at the end of that week.
+            replay = current_week < auto_week
+            if replay:
+                week_docs = derive_documents_as_of(project_key, log_version, current_week, df_log, log_history, df_baseline)
+            else:
+                week_docs = summary
+            week_summary = derive_week(project_key, log_version, current_week, replay, week_docs.documents)
+            total = len(week_docs.documents)
+            selesai = int(week_docs.status_count['Selesai'])
+            proses = int(week_docs.status_count['Proses'])
+            belum = int(week_docs.status_count['Belum'])
+            avg_progress = week_docs.avg_progress
+            overdue = int(week_summary.overdue.sum())
+        if replay:
+            st.caption(f"⏪ Showing project state as of the end of week {current_week}")
+    
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.markdown(kpi_card("Total Documents", total, "All deliverables"), unsafe_allow_html=True)
+        with col2:
+            st.markdown(kpi_card("Completed", selesai, f"✓ {selesai/total*100:.0f}% done"), unsafe_allow_html=True)
+        with col3:
+            st.markdown(kpi_card("In Progress", proses, f"{proses/total*100:.0f}% active"), unsafe_allow_html=True)
+        with col4:
+            st.markdown(kpi_card("Not Started", belum, f"{belum/total*100:.0f}% pending"), unsafe_allow_html=True)
+        with col5:
+            st.markdown(kpi_card("Overdue", overdue, "⚠️ Attention" if overdue > 0 else "✓ On track"), unsafe_allow_html=True)
+    
+        st.markdown('<div class="section-title">📈 Overall Progress</div>', unsafe_allow_html=True)
+        st.markdown(progress_bar("Project Completion", avg_progress, 100), unsafe_allow_html=True)
+
+        if not replay:
+            st.markdown('<div class="section-title">🔮 Completion Forecast</div>', unsafe_allow_html=True)
+            forecast = derive_forecast(project_key, log_version, df_log, df_baseline)
+            outlook = forecast.project
+            col_f1, col_f2, col_f3, col_f4 = st.columns(4)
+            with col_f1:
+                st.markdown(kpi_card("P50 Finish", f"Week {outlook['p50']}", "Even odds"), unsafe_allow_html=True)
+            with col_f2:
+                st.markdown(kpi_card("P80 Finish", f"Week {outlook['p80']}", "Likely"), unsafe_allow_html=True)
+            with col_f3:
+                st.markdown(kpi_card("P95 Finish", f"Week {outlook['p95']}", "Near certain"), unsafe_allow_html=True)
+            with col_f4:
+                st.markdown(kpi_card("On-Time Chance", f"{outlook['on_time']:.0%}",
+                                     f"Target: week {outlook['target_week']}"), unsafe_allow_html=True)
+            st.caption(f"{forecast.simulations:,} simulations from logged progress velocity, "
+                       f"as of {forecast.as_of:%d %b %Y %H:%M}")
+            with st.expander("Per-document forecast"):
+                df_forecast = forecast.documents.assign(on_time=(forecast.documents["on_time"] * 100).round())
+                st.dataframe(
+                    df_forecast.rename(columns={"document": "Document", "target_week": "Target Week",
+                                                "progress": "Progress (%)", "on_time": "On Time (%)",
+                                                "p50": "P50 Week", "p80": "P80 Week", "p95": "P95 Week"}),
+                    use_container_width=True, hide_index=True)
+    
+        st.markdown('<div class="section-title">📊 Analytics</div>', unsafe_allow_html=True)
+    
+        col_c1, col_c2 = st.columns(2)
+    
+        with col_c1:
+            st.markdown('<div class="chart-container"><div class="chart-header">Status Distribution</div>', unsafe_allow_html=True)
+            status_count = week_docs.status_count
         
-        fig = go.Figure(data=[go.Bar(
-            x=status_count.index,
-            y=status_count.values,
-            text=status_count.values,
-            textposition='outside',
-            textfont=dict(size=14),
-            marker_color=[STATUS_COLORS[s] for s in status_count.index]
-        )])
-        fig.update_layout(
-            height=320, 
-            font=dict(size=14),
-            plot_bgcolor='white',
-            margin=dict(l=20, r=20, t=20, b=40),
-            xaxis=dict(title="", tickfont=dict(size=13)),
-            yaxis=dict(title="Count", tickfont=dict(size=13), gridcolor='#F1F5F9')
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col_c2:
-        st.markdown('<div class="chart-container"><div class="chart-header">Workload by Role</div>', unsafe_allow_html=True)
-        role_count = df_dokumen.groupby('pic_role').size()
+            with stage("figure.status"):
+                fig = figure("counts", status_count, colors=STATUS_COLORS, y_title="Count")
+            with stage("chart.status"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+        with col_c2:
+            st.markdown('<div class="chart-container"><div class="chart-header">Workload by Role</div>', unsafe_allow_html=True)
+            role_count = week_docs.role_count
         
-        fig2 = go.Figure(data=[go.Bar(
-            x=role_count.index,
-            y=role_count.values,
-            text=role_count.values,
-            textposition='outside',
-            textfont=dict(size=14),
-            marker_color=COLORS['primary']
-        )])
-        fig2.update_layout(
-            height=320,
-            font=dict(size=14),
-            plot_bgcolor='white',
-            margin=dict(l=20, r=20, t=20, b=40),
-            xaxis=dict(title="", tickfont=dict(size=13)),
-            yaxis=dict(title="Tasks", tickfont=dict(size=13), gridcolor='#F1F5F9')
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+            with stage("figure.role"):
+                fig2 = figure("counts", role_count, y_title="Tasks")
+            with stage("chart.role"):
+                st.plotly_chart(fig2, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+        st.markdown('<div class="section-title">📋 Document Progress</div>', unsafe_allow_html=True)
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    
+        show_all_docs = False
+        if len(week_docs.documents) > PROGRESS_TOP_N:
+            show_all_docs = st.toggle(f"Show all {len(week_docs.documents)} documents", kept("progress_all", False),
+                                      key="progress_all", on_change=keep, args=("progress_all",))
+    
+        with stage("figure.progress"):
+            fig3 = figure("progress", week_docs.documents[["document", "status", "progress"]], top_n=None if show_all_docs else PROGRESS_TOP_N)
+        with stage("chart.progress"):
+            st.plotly_chart(fig3, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
-    st.markdown('<div class="section-title">📋 Document Progress</div>', unsafe_allow_html=True)
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    
-    df_sorted = df_dokumen.sort_values('progress', ascending=True)
-    
-    fig3 = go.Figure(data=[go.Bar(
-        x=df_sorted['progress'],
-        y=df_sorted['document'],
-        orientation='h',
-        text=df_sorted['progress'].apply(lambda x: f'{x:.0f}%'),
-        textposition='outside',
-        textfont=dict(size=13),
-        marker_color=[STATUS_COLORS[s] for s in df_sorted['status']]
-    )])
-    fig3.update_layout(
-        height=max(400, len(df_sorted) * 45),
-        font=dict(size=14),
-        plot_bgcolor='white',
-        margin=dict(l=20, r=40, t=20, b=40),
-        xaxis=dict(range=[0, 115], title="Progress (%)", tickfont=dict(size=13), gridcolor='#F1F5F9'),
-        yaxis=dict(title="", tickfont=dict(size=13))
-    )
-    st.plotly_chart(fig3, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    st.markdown('<div class="section-title">⚠️ Alerts</div>', unsafe_allow_html=True)
-    overdue_df = df_dokumen[df_dokumen["overdue"]]
-    if overdue_df.empty:
-        st.markdown(alert_box("✓ All documents are on track.", "success"), unsafe_allow_html=True)
-    else:
-        for _, row in overdue_df.iterrows():
-            weeks_late = current_week - row["target_week"]
-            st.markdown(alert_box(
-                f"<strong>{row['document']}</strong> — {weeks_late} week(s) overdue — PIC: {row['pic_role']}",
-                "error"
-            ), unsafe_allow_html=True)
+        st.markdown('<div class="section-title">⚠️ Alerts</div>', unsafe_allow_html=True)
+        overdue_df = week_summary.overdue_df
+        if overdue_df.empty:
+            st.markdown(alert_box("✓ All documents are on track.", "success"), unsafe_allow_html=True)
+        else:
+            # Most overdue first, capped, rendered as one block.
+            shown = overdue_df.sort_values("target_week", kind="stable").head(ALERT_LIMIT)
+            weeks_late = (current_week - shown["target_week"]).astype(str)
+            alerts = alert_boxes("<strong>" + shown["document"].astype(str) + "</strong> — " + weeks_late
+                                 + " week(s) overdue — PIC: " + shown["pic_role"].astype(str), "error")
+            if len(overdue_df) > ALERT_LIMIT:
+                alerts += alert_box(f"+{len(overdue_df) - ALERT_LIMIT} more overdue documents", "warning")
+            st.markdown(alerts, unsafe_allow_html=True)
 
 # =============================================
 # TAB 2: TEAM
 # =============================================
-with tabs[1]:
-    st.markdown('<div class="section-title">👥 Team Overview</div>', unsafe_allow_html=True)
-    
-    cols = st.columns(4)
-    for idx, (_, row) in enumerate(df_tim.iterrows()):
-        with cols[idx]:
-            tasks = df_dokumen[df_dokumen['pic_role'] == row['Role']]
-            completed = len(tasks[tasks['status'] == 'Selesai'])
-            st.markdown(kpi_card(row['Role'], len(tasks), f"✓ {completed} completed"), unsafe_allow_html=True)
-    
-    st.markdown('<div class="section-title">📋 Team Details</div>', unsafe_allow_html=True)
-    st.dataframe(df_tim, use_container_width=True, hide_index=True)
-    
-    st.markdown('<div class="section-title">📊 Workload Distribution</div>', unsafe_allow_html=True)
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    
-    workload_data = []
-    for role in ['PM', 'BA/SA', 'UI/UX', 'Backend/DB']:
-        role_docs = df_dokumen[df_dokumen['pic_role'] == role]
-        workload_data.append({
-            'Role': role,
-            'Completed': int((role_docs['status'] == 'Selesai').sum()),
-            'In Progress': int((role_docs['status'] == 'Proses').sum()),
-            'Not Started': int((role_docs['status'] == 'Belum').sum())
-        })
-    df_workload = pd.DataFrame(workload_data)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Bar(name='Completed', x=df_workload['Role'], y=df_workload['Completed'],
-                         marker_color=COLORS['success'], text=df_workload['Completed'], textposition='inside'))
-    fig.add_trace(go.Bar(name='In Progress', x=df_workload['Role'], y=df_workload['In Progress'],
-                         marker_color=COLORS['warning'], text=df_workload['In Progress'], textposition='inside'))
-    fig.add_trace(go.Bar(name='Not Started', x=df_workload['Role'], y=df_workload['Not Started'],
-                         marker_color=COLORS['neutral'], text=df_workload['Not Started'], textposition='inside'))
-    fig.update_layout(
-        barmode='stack', height=380, font=dict(size=14),
-        plot_bgcolor='white', margin=dict(l=20, r=20, t=40, b=40),
-        legend=dict(orientation='h', y=1.1, font=dict(size=13)),
-        xaxis=dict(tickfont=dict(size=13)),
-        yaxis=dict(tickfont=dict(size=13), gridcolor='#F1F5F9')
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# =============================================
-# TAB 3: RISK
-# =============================================
-with tabs[2]:
-    st.markdown('<div class="section-title">⚠️ Risk Summary</div>', unsafe_allow_html=True)
-    
-    open_risks = len(df_risiko[df_risiko['Status'] == 'Open'])
-    mitigated = len(df_risiko[df_risiko['Status'] == 'Mitigated'])
-    high_score = len(df_risiko[df_risiko['Skor'] >= 6])
+if tab_open(tabs[1]):
+    with tabs[1], stage("tab.team"):
+        st.markdown('<div class="section-title">👥 Team Overview</div>', unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(kpi_card("Open Risks", open_risks, "⚠️ Action needed"), unsafe_allow_html=True)
-    with col2:
-        st.markdown(kpi_card("Mitigated", mitigated, "✓ Under control"), unsafe_allow_html=True)
-    with col3:
-        st.markdown(kpi_card("High Score (≥6)", high_score, "Critical"), unsafe_allow_html=True)
+        role_tasks = summary.role_status.reindex(df_tim['Role'], fill_value=0)
+        for col, role, total, completed in zip(st.columns(len(df_tim)), df_tim['Role'],
+                                               role_tasks.sum(axis=1), role_tasks['Selesai']):
+            with col:
+                st.markdown(kpi_card(role, int(total), f"✓ {completed} completed"), unsafe_allow_html=True)
     
-    st.markdown('<div class="section-title">📋 Risk Register</div>', unsafe_allow_html=True)
-    st.dataframe(df_risiko, use_container_width=True, hide_index=True)
+        st.markdown('<div class="section-title">📋 Team Details</div>', unsafe_allow_html=True)
+        with stage("render.team"):
+            st.dataframe(df_tim, use_container_width=True, hide_index=True)
     
-    st.markdown('<div class="section-title">📊 Risk Analysis</div>', unsafe_allow_html=True)
+        st.markdown('<div class="section-title">📊 Workload Distribution</div>', unsafe_allow_html=True)
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     
-    col_r1, col_r2 = st.columns(2)
+        df_workload = summary.workload
     
-    with col_r1:
-        st.markdown('<div class="chart-container"><div class="chart-header">By Status</div>', unsafe_allow_html=True)
-        status_count = df_risiko['Status'].value_counts()
-        
-        fig = go.Figure(data=[go.Bar(
-            x=status_count.index, y=status_count.values,
-            text=status_count.values, textposition='outside', textfont=dict(size=14),
-            marker_color=[COLORS['danger'] if x == 'Open' else COLORS['success'] for x in status_count.index]
-        )])
-        fig.update_layout(
-            height=300, font=dict(size=14), plot_bgcolor='white',
-            margin=dict(l=20, r=20, t=20, b=40),
-            xaxis=dict(tickfont=dict(size=13)),
-            yaxis=dict(tickfont=dict(size=13), gridcolor='#F1F5F9')
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with stage("figure.workload"):
+            fig = figure("workload", df_workload)
+        with stage("chart.workload"):
+            st.plotly_chart(fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col_r2:
-        st.markdown('<div class="chart-container"><div class="chart-header">By Strategy</div>', unsafe_allow_html=True)
-        strategy_count = df_risiko['Strategi'].value_counts()
+
+# =============================================
+# TAB 3: RISK
+# =============================================
+if tab_open(tabs[2]):
+    with tabs[2], stage("tab.risk"):
+        st.markdown('<div class="section-title">⚠️ Risk Summary</div>', unsafe_allow_html=True)
+
+        with stage("load_risks"):
+            try:
+                _, df_risks = load_risk_log(project_key)
+            except Exception as e:
+                st.warning(f"⚠️ Risk log load error: {str(e)}")
+                df_risks = normalize_risks(pd.DataFrame(columns=RISK_COLUMNS))
+        risks = derive_risks(project_key, df_risks)
+        risk_summary = risks.summary
+        open_risks = risk_summary.open
+        mitigated = risk_summary.mitigated
+        high_score = risk_summary.high_score
+    
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(kpi_card("Open Risks", open_risks, "⚠️ Action needed"), unsafe_allow_html=True)
+        with col2:
+            st.markdown(kpi_card("Mitigated", mitigated, "✓ Under control"), unsafe_allow_html=True)
+        with col3:
+            st.markdown(kpi_card(f"High Score (≥{HIGH_SCORE})", high_score, "Critical"), unsafe_allow_html=True)
+        with col4:
+            st.markdown(kpi_card("Open Exposure", f"{risk_summary.exposure:.1f}", "Σ likelihood × impact"), unsafe_allow_html=True)
+    
+        st.markdown('<div class="section-title">📋 Risk Register</div>', unsafe_allow_html=True)
+        risk_pages = page_count(risk_summary.total)
+        risk_page = st.number_input("Page", 1, risk_pages, min(kept("risk_page", 1), risk_pages), key="risk_page",
+                                    on_change=keep, args=("risk_page",)) if risk_pages > 1 else 1
+        if risk_pages > 1:
+            st.caption(f"{risk_summary.total} risks, highest score first — page {risk_page} of {risk_pages}")
+        with stage("render.risk"):
+            st.dataframe(paginate(risks.table, risk_page), use_container_width=True, hide_index=True)
+    
+        st.markdown('<div class="section-title">📊 Risk Analysis</div>', unsafe_allow_html=True)
+    
+        col_r1, col_r2, col_r3 = st.columns(3)
+    
+        with col_r1:
+            st.markdown('<div class="chart-container"><div class="chart-header">By Status</div>', unsafe_allow_html=True)
+            status_count = risk_summary.status_count
         
-        fig2 = go.Figure(data=[go.Bar(
-            x=strategy_count.index, y=strategy_count.values,
-            text=strategy_count.values, textposition='outside', textfont=dict(size=14),
-            marker_color=COLORS['primary']
-        )])
-        fig2.update_layout(
-            height=300, font=dict(size=14), plot_bgcolor='white',
-            margin=dict(l=20, r=20, t=20, b=40),
-            xaxis=dict(tickfont=dict(size=13)),
-            yaxis=dict(tickfont=dict(size=13), gridcolor='#F1F5F9')
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+            with stage("figure.risk_status"):
+                fig = figure("counts", status_count, colors=RISK_STATUS_COLORS, height=300)
+            with stage("chart.risk_status"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+        with col_r2:
+            st.markdown('<div class="chart-container"><div class="chart-header">By Strategy</div>', unsafe_allow_html=True)
+            strategy_count = risk_summary.strategy_count
+        
+            with stage("figure.risk_strategy"):
+                fig2 = figure("counts", strategy_count, height=300)
+            with stage("chart.risk_strategy"):
+                st.plotly_chart(fig2, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        with col_r3:
+            st.markdown('<div class="chart-container"><div class="chart-header">Open Risks: Probability × Impact</div>', unsafe_allow_html=True)
+            with stage("figure.risk_heatmap"):
+                fig3 = figure("risk_heatmap", risk_summary.matrix, levels=tuple(LEVELS))
+            with stage("chart.risk_heatmap"):
+                st.plotly_chart(fig3, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
 
 # =============================================
 # TAB 4: EVM
 # =============================================
-with tabs[3]:
-    st.markdown('<div class="section-title">💰 Earned Value Management</div>', unsafe_allow_html=True)
-    
-    current_week_evm = st.slider("📅 Select Week", 1, 12, min(6, auto_week), key="evm_week")
-    
-    BAC = 500000
-    df_evm_current = df_evm[df_evm['Minggu'] <= current_week_evm]
-    
-    if len(df_evm_current) > 0 and df_evm_current['EV'].iloc[-1] > 0:
-        PV = df_evm_current['PV'].iloc[-1]
-        EV = df_evm_current['EV'].iloc[-1]
-        AC = df_evm_current['AC'].iloc[-1]
-        SV, CV = EV - PV, EV - AC
-        SPI = EV / PV if PV > 0 else 0
-        CPI = EV / AC if AC > 0 else 0
-        EAC = BAC / CPI if CPI > 0 else BAC
-    else:
-        PV, EV, AC, SV, CV, SPI, CPI, EAC = 0, 0, 0, 0, 0, 0, 0, BAC
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(kpi_card("Budget (BAC)", f"Rp {BAC/1000:.0f}K", "Total"), unsafe_allow_html=True)
-    with col2:
-        st.markdown(kpi_card("Earned Value", f"Rp {EV/1000:.0f}K", f"✓ {EV/BAC*100:.0f}%"), unsafe_allow_html=True)
-    with col3:
-        st.markdown(kpi_card("Actual Cost", f"Rp {AC/1000:.0f}K", f"{AC/BAC*100:.0f}% spent"), unsafe_allow_html=True)
-    with col4:
-        st.markdown(kpi_card("EAC", f"Rp {EAC/1000:.0f}K", "Forecast"), unsafe_allow_html=True)
-    
-    col5, col6, col7 = st.columns(3)
-    with col5:
-        st.markdown(kpi_card("CPI", f"{CPI:.2f}", "✓ Efficient" if CPI >= 1 else "⚠️ Over budget"), unsafe_allow_html=True)
-    with col6:
-        st.markdown(kpi_card("SPI", f"{SPI:.2f}", "✓ On time" if SPI >= 1 else "⚠️ Behind"), unsafe_allow_html=True)
-    with col7:
-        health = "🟢 Green" if (SPI >= 0.95 and CPI >= 0.95) else "🟡 Amber" if (SPI >= 0.8 and CPI >= 0.8) else "🔴 Red"
-        st.markdown(kpi_card("Health", health, "RAG Status"), unsafe_allow_html=True)
-    
-    st.markdown('<div class="section-title">📈 S-Curve Analysis</div>', unsafe_allow_html=True)
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df_evm['Minggu'], y=df_evm['PV'], mode='lines+markers',
-                             name='PV', line=dict(color=COLORS['neutral'], width=2, dash='dash'), marker=dict(size=8)))
-    fig.add_trace(go.Scatter(x=df_evm_current['Minggu'], y=df_evm_current['EV'], mode='lines+markers',
-                             name='EV', line=dict(color=COLORS['primary'], width=3), marker=dict(size=8)))
-    fig.add_trace(go.Scatter(x=df_evm_current['Minggu'], y=df_evm_current['AC'], mode='lines+markers',
-                             name='AC', line=dict(color=COLORS['danger'], width=2), marker=dict(size=8)))
-    fig.update_layout(
-        height=420, font=dict(size=14), plot_bgcolor='white',
-        margin=dict(l=20, r=20, t=40, b=40),
-        legend=dict(orientation='h', y=1.1, font=dict(size=13)),
-        xaxis=dict(title='Week', tickfont=dict(size=13), gridcolor='#F1F5F9'),
-        yaxis=dict(title='Value (Rp)', tickfont=dict(size=13), gridcolor='#F1F5F9')
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+if tab_open(tabs[3]):
+    with tabs[3], stage("tab.evm"):
+        st.markdown('<div class="section-title">💰 Earned Value Management</div>', unsafe_allow_html=True)
+    
+        col_s, col_g = st.columns([3, 1])
+        with col_s:
+            current_week_evm = st.slider("📅 Select Week", 1, PROJECT_WEEKS, kept("evm_week", min(6, auto_week)),
+                                         key="evm_week", on_change=keep, args=("evm_week",))
+        with col_g:
+            granularity = st.radio("Granularity", ["week", "day"], ["week", "day"].index(kept("evm_granularity", "week")),
+                                   format_func=str.title, horizontal=True,
+                                   key="evm_granularity", on_change=keep, args=("evm_granularity",))
+    
+        with stage("aggregate.evm"):
+            try:
+                costs_at, df_costs = load_costs(project_key)
+            except Exception as e:
+                st.warning(f"⚠️ Cost log load error: {str(e)}")
+                costs_at, df_costs = None, None
+            evm_weeks = max(PROJECT_WEEKS, int(df_baseline["target_week"].max()), log_weeks.max_week or 0)
+            evm = derive_evm(project_key, log_version, costs_at, granularity, evm_weeks, df_log, df_baseline, df_costs)
+            i = period_at_week(evm, current_week_evm)
+            BAC = evm.bac
+            PV, EV, AC = evm.pv[i], evm.ev[i], evm.ac[i]
+            SV, CV, SPI, CPI, EAC = evm.sv[i], evm.cv[i], evm.spi[i], evm.cpi[i], evm.eac[i]
+    
+        if BAC <= 0:
+            st.markdown(alert_box("No budgets in the baseline; add a <code>budget</code> per document to compute EVM.", "warning"), unsafe_allow_html=True)
+        elif not evm.has_costs:
+            st.markdown(alert_box("No cost log for this project; AC, CPI and EAC need cost entries.", "info"), unsafe_allow_html=True)
+    
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(kpi_card("Budget (BAC)", f"Rp {BAC/1000:.0f}K", "Total"), unsafe_allow_html=True)
+        with col2:
+            st.markdown(kpi_card("Earned Value", f"Rp {EV/1000:.0f}K", f"✓ {EV/BAC*100 if BAC else 0:.0f}%"), unsafe_allow_html=True)
+        with col3:
+            st.markdown(kpi_card("Actual Cost", f"Rp {AC/1000:.0f}K", f"{AC/BAC*100 if BAC else 0:.0f}% spent"), unsafe_allow_html=True)
+        with col4:
+            st.markdown(kpi_card("EAC", f"Rp {EAC/1000:.0f}K", "Forecast"), unsafe_allow_html=True)
+    
+        col5, col6, col7 = st.columns(3)
+        with col5:
+            st.markdown(kpi_card("CPI", f"{CPI:.2f}", "✓ Efficient" if CPI >= 1 else "⚠️ Over budget"), unsafe_allow_html=True)
+        with col6:
+            st.markdown(kpi_card("SPI", f"{SPI:.2f}", "✓ On time" if SPI >= 1 else "⚠️ Behind"), unsafe_allow_html=True)
+        with col7:
+            cpi_health = CPI if evm.has_costs else SPI
+            health = "🟢 Green" if (SPI >= 0.95 and cpi_health >= 0.95) else "🟡 Amber" if (SPI >= 0.8 and cpi_health >= 0.8) else "🔴 Red"
+            st.markdown(kpi_card("Health", health, "RAG Status"), unsafe_allow_html=True)
+    
+        st.markdown('<div class="section-title">📈 S-Curve Analysis</div>', unsafe_allow_html=True)
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    
+        with stage("figure.scurve"):
+            fig = figure("scurve", evm.periods, evm.pv, evm.ev, evm.ac if evm.has_costs else None, i,
+                         weekly=granularity == "week")
+        with stage("chart.scurve"):
+            st.plotly_chart(fig, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+        download_buttons(f"evm-{project_key}-{granularity}", lambda: iter_chunks(evm_table(evm)), "export_evm")
 
 # =============================================
 # TAB 5: DOCUMENTS
 # =============================================
-with tabs[4]:
-    st.markdown('<div class="section-title">📄 Document Tracker</div>', unsafe_allow_html=True)
-    
-    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
-    col_f1, col_f2 = st.columns(2)
-    with col_f1:
-        status_filter = st.multiselect("Status", STATUS_ORDER, default=STATUS_ORDER)
-    with col_f2:
-        role_filter = st.multiselect("Role", sorted(df_dokumen['pic_role'].unique()), 
-                                     default=sorted(df_dokumen['pic_role'].unique()))
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    df_filtered = df_dokumen[(df_dokumen['status'].isin(status_filter)) & (df_dokumen['pic_role'].isin(role_filter))]
-    st.markdown(f"**Showing {len(df_filtered)} of {len(df_dokumen)} documents**")
-    
-    display_cols = ['document', 'phase', 'pic_role', 'target_week', 'status', 'progress']
-    df_display = df_filtered[display_cols].copy()
-    df_display['progress'] = df_display['progress'].apply(lambda x: f"{x:.0f}%")
-    st.dataframe(df_display, use_container_width=True, hide_index=True, height=400)
+if tab_open(tabs[4]):
+    with tabs[4], stage("tab.documents"):
+        st.markdown('<div class="section-title">📄 Document Tracker</div>', unsafe_allow_html=True)
+    
+        st.markdown('<div class="filter-section">', unsafe_allow_html=True)
+        col_f1, col_f2 = st.columns(2)
+        with col_f1:
+            status_filter = st.multiselect("Status", STATUS_ORDER,
+                                           default=kept_options("documents_status", STATUS_ORDER, STATUS_ORDER),
+                                           key="documents_status", on_change=keep, args=("documents_status",))
+        with col_f2:
+            roles = sorted(df_dokumen['pic_role'].unique())
+            role_filter = st.multiselect("Role", roles, default=kept_options("documents_role", roles, roles),
+                                         key="documents_role", on_change=keep, args=("documents_role",))
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+        with stage("aggregate.documents"):
+            df_filtered = df_dokumen[(df_dokumen['status'].isin(status_filter)) & (df_dokumen['pic_role'].isin(role_filter))]
+        doc_pages = page_count(len(df_filtered))
+        doc_page = st.number_input("Page", 1, doc_pages, min(kept("documents_page", 1), doc_pages), key="documents_page",
+                                   on_change=keep, args=("documents_page",)) if doc_pages > 1 else 1
+        with stage("aggregate.documents_page"):
+            display_cols = ['document', 'phase', 'pic_role', 'target_week', 'status', 'progress']
+            df_display = paginate(df_filtered, doc_page)[display_cols].copy()
+            df_display['progress'] = df_display['progress'].round().astype('int64').astype(str) + "%"
+        st.markdown(f"**Showing {len(df_filtered)} of {len(df_dokumen)} documents** — page {doc_page} of {doc_pages}")
+        with stage("render.documents"):
+            st.dataframe(df_display, use_container_width=True, hide_index=True)
+        download_buttons(f"documents-{project_key}", lambda: iter_chunks(df_filtered[display_cols]), "export_documents")
 
 # =============================================
 # TAB 6: LOG
 # =============================================
-with tabs[5]:
-    st.markdown('<div class="section-title">📝 Activity Log</div>', unsafe_allow_html=True)
-    
-    if not data_loaded or df_log.empty:
-        st.markdown(alert_box("No log data available.", "warning"), unsafe_allow_html=True)
-    else:
-        max_week = int(df_log["week_no"].max())
-        week_pick = st.multiselect("📅 Filter Week", list(range(1, max_week + 1)), default=[max_week])
-        df_view = df_log[df_log["week_no"].isin(week_pick)]
+if tab_open(tabs[5]):
+    with tabs[5], stage("tab.log"):
+        st.markdown('<div class="section-title">📝 Activity Log</div>', unsafe_allow_html=True)
+    
+        if not data_loaded or df_log.empty:
+            st.markdown(alert_box("No log data available.", "warning"), unsafe_allow_html=True)
+        else:
+            max_week = log_weeks.max_week
+            week_pick = st.multiselect("📅 Filter Week", list(range(1, max_week + 1)),
+                                       default=kept_options("log_weeks", range(1, max_week + 1), [max_week]),
+                                       key="log_weeks", on_change=keep, args=("log_weeks",))
+            with stage("aggregate.log"):
+                n_view = log_weeks.count(week_pick)
+                n_docs = log_weeks.document_count(week_pick)
         
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(kpi_card("Updates", len(df_view), "Filtered"), unsafe_allow_html=True)
-        with col2:
-            st.markdown(kpi_card("Documents", df_view["document"].nunique(), "Updated"), unsafe_allow_html=True)
-        with col3:
-            st.markdown(kpi_card("Total Logs", len(df_log), "All time"), unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(kpi_card("Updates", n_view, "Filtered"), unsafe_allow_html=True)
+            with col2:
+                st.markdown(kpi_card("Documents", n_docs, "Updated"), unsafe_allow_html=True)
+            with col3:
+                st.markdown(kpi_card("Total Logs", len(df_log), "All time"), unsafe_allow_html=True)
         
-        st.markdown('<div class="section-title">📋 Log Entries</div>', unsafe_allow_html=True)
-        show_cols = [c for c in ["timestamp", "week_no", "document", "status", "progress", "pic_role"] if c in df_view.columns]
-        st.dataframe(df_view.sort_values("timestamp", ascending=False)[show_cols], use_container_width=True, hide_index=True, height=400)
+            st.markdown('<div class="section-title">📋 Log Entries</div>', unsafe_allow_html=True)
+            log_pages = page_count(n_view)
+            col_p, col_s = st.columns([1, 3])
+            with col_p:
+                log_page = st.number_input("Page", 1, log_pages, min(kept("log_page", 1), log_pages), key="log_page",
+                                           on_change=keep, args=("log_page",))
+            with col_s:
+                newest_first = st.radio("Sort", ["Newest first", "Oldest first"],
+                                        ["Newest first", "Oldest first"].index(kept("log_sort", "Newest first")),
+                                        horizontal=True, key="log_sort", on_change=keep,
+                                        args=("log_sort",)) == "Newest first"
+            with stage("aggregate.log_page"):
+                df_page = LogPager(df_log, log_weeks).page(week_pick, log_page, newest_first=newest_first)
+            show_cols = [c for c in ["timestamp", "week_no", "document", "status", "progress", "pic_role"] if c in df_page.columns]
+            first = (log_page - 1) * PAGE_SIZE
+            st.caption(f"Rows {min(first + 1, n_view)}–{first + len(df_page)} of {n_view}")
+            with stage("render.log"):
+                st.dataframe(df_page[show_cols], use_container_width=True, hide_index=True)
+            download_buttons(f"log-{project_key}",
+                             lambda: iter_chunks(df_log, LogPager(df_log, log_weeks).positions(week_pick, newest_first)),
+                             "export_log")
+
+# =============================================
+# PERFORMANCE
+# =============================================
+if timing.ENABLED:
+    with st.sidebar.expander("⏱️ Performance"):
+        perf = timing.summary()
+        if perf:
+            st.dataframe(pd.DataFrame(perf).set_index("stage").round(1), use_container_width=True)
+        st.caption(f"Rolling window: last {timing.WINDOW} runs per stage (ms)")
+    timing.log_summary()
 
 # =============================================
 # FOOTER
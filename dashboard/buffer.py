@@ -0,0 +1,163 @@
+"""Growable, pre-typed column storage backing the in-memory log.
+
+Rows are appended chunk by chunk into per-column arrays (datetime64/int/float
+arrays, categorical codes with an interned category list, Arrow chunks for
+free text), so ingestion never holds more than one parsed chunk on top of
+the buffer itself. ``to_frame`` returns a DataFrame of views over the
+filled part: appending later never copies or mutates rows an earlier frame
+can see.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DATETIME_COLUMNS = {"timestamp", "week_start"}
+NUMERIC_COLUMNS = {"week_no": "int16", "progress": "float32"}
+CATEGORY_COLUMNS = {"status", "document", "pic_role", "phase", "updated_by"}
+
+
+def _code_dtype(n_categories):
+    # Same widths pandas picks for Categorical codes, so from_codes doesn't copy.
+    if n_categories < np.iinfo(np.int8).max:
+        return np.dtype(np.int8)
+    if n_categories < np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    return np.dtype(np.int32)
+
+
+def reserve(array, n, size):
+    """``array`` with room for ``size`` items, keeping its first ``n``; returns the array.
+
+    Copies into a new array when it is too small or read-only (e.g.
+    memory-mapped), so earlier views of the first ``n`` items stay valid.
+    """
+    if size > len(array) or not array.flags.writeable:
+        grown = np.empty(max(size, len(array)), dtype=array.dtype)
+        grown[:n] = array[:n]
+        array = grown
+    return array
+
+
+def extend(array, n, values):
+    """``array`` with ``values`` written after its first ``n`` items; returns the array.
+
+    Writes in place when there is room, else grows it (see ``reserve``) to room
+    for as many again. Items before ``n`` are never modified, so earlier views
+    of them stay valid.
+    """
+    size = n + len(values)
+    if size > len(array) or not array.flags.writeable:
+        array = reserve(array, n, max(size, 2 * n, 1024))
+    array[n:size] = values
+    return array
+
+
+def _kind(col):
+    if col in DATETIME_COLUMNS:
+        return "datetime"
+    if col in NUMERIC_COLUMNS:
+        return "numeric"
+    if col in CATEGORY_COLUMNS:
+        return "category"
+    return "string"
+
+
+class ColumnBuffer:
+    def __init__(self, capacity=1024):
+        self.n = 0
+        self.capacity = capacity
+        self.columns = None
+        self._arrays = {}
+        self._categories = {}
+        self._lookup = {}
+        self._strings = {}
+
+    @classmethod
+    def from_frame(cls, df, categories=None):
+        buffer = cls(capacity=max(1024, len(df)))
+        for col, values in (categories or {}).items():
+            buffer.seed_categories(col, values)
+        buffer.append(df)
+        return buffer
+
+    def seed_categories(self, col, values):
+        cats = self._categories.setdefault(col, [])
+        lookup = self._lookup.setdefault(col, {})
+        for value in values:
+            if value not in lookup:
+                lookup[value] = len(cats)
+                cats.append(value)
+
+    def append(self, chunk):
+        if self.columns is None:
+            self._init_schema(chunk)
+        k = len(chunk)
+        self._reserve(self.n + k)
+        lo, hi = self.n, self.n + k
+        for col in self.columns:
+            kind = _kind(col)
+            values = chunk[col]
+            if kind == "datetime":
+                self._arrays[col][lo:hi] = values.to_numpy(dtype="datetime64[ns]")
+            elif kind == "numeric":
+                self._arrays[col][lo:hi] = values.to_numpy(dtype=NUMERIC_COLUMNS[col])
+            elif kind == "category":
+                self._arrays[col][lo:hi] = self._encode(col, values)
+            else:
+                arr = pa.array(values, type=pa.large_string(), from_pandas=True)
+                self._strings[col].extend(arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr])
+        self.n = hi
+
+    def reserve(self, rows):
+        """Make room for ``rows`` more rows up front."""
+        self._reserve(self.n + rows)
+
+    def to_frame(self, start=0, stop=None):
+        stop = self.n if stop is None else stop
+        data = {}
+        for col in self.columns or []:
+            kind = _kind(col)
+            if kind == "category":
+                data[col] = pd.Categorical.from_codes(self._arrays[col][start:stop],
+                                                      categories=pd.Index(self._categories[col]),
+                                                      validate=False)
+            elif kind == "string":
+                chunks = pa.chunked_array(self._strings[col], type=pa.large_string())
+                data[col] = pd.arrays.ArrowStringArray(chunks.slice(start, stop - start))
+            else:
+                data[col] = self._arrays[col][start:stop]
+        return pd.DataFrame(data, copy=False)
+
+    def _init_schema(self, chunk):
+        self.columns = list(chunk.columns)
+        for col in self.columns:
+            kind = _kind(col)
+            if kind == "datetime":
+                self._arrays[col] = np.empty(self.capacity, dtype="datetime64[ns]")
+            elif kind == "numeric":
+                self._arrays[col] = np.empty(self.capacity, dtype=NUMERIC_COLUMNS[col])
+            elif kind == "category":
+                self.seed_categories(col, [])
+                self._arrays[col] = np.empty(self.capacity, dtype=_code_dtype(len(self._categories[col])))
+            else:
+                self._strings[col] = []
+
+    def _reserve(self, size):
+        if size > self.capacity:
+            capacity = max(size, self.capacity * 2)
+            for col, arr in self._arrays.items():
+                grown = np.empty(capacity, dtype=arr.dtype)
+                grown[:self.n] = arr[:self.n]
+                self._arrays[col] = grown
+            self.capacity = capacity
+
+    def _encode(self, col, values):
+        values = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        self.seed_categories(col, values.cat.categories)
+        lookup = self._lookup[col]
+        mapping = np.array([lookup[c] for c in values.cat.categories] + [-1], dtype=np.int64)
+        dtype = _code_dtype(len(self._categories[col]))
+        if dtype != self._arrays[col].dtype:
+            self._arrays[col] = self._arrays[col].astype(dtype)
+        # codes of -1 (missing) pick the trailing -1 in ``mapping``
+        return mapping[values.array.codes].astype(dtype)
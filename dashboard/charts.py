@@ -0,0 +1,169 @@
+"""Plotly figure builders for the dashboard.
+
+Shared styling lives in one ``dashboard`` template layered over the active
+default (Streamlit's theme inside the app), so builders only set what is
+specific to their chart. Builders are pure functions of their aggregates;
+the app memoizes them on the aggregate's content, so an unchanged chart is
+the same figure object from one rerun to the next.
+
+Plotly is imported on the first figure built, not with this module, so a
+cold process can paint the page before paying for it.
+"""
+import functools
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+COLORS = {
+    'primary': '#0F172A',
+    'success': '#10B981',
+    'warning': '#F59E0B',
+    'danger': '#EF4444',
+    'neutral': '#64748B',
+}
+
+STATUS_COLORS = {
+    "Selesai": COLORS['success'],
+    "Proses": COLORS['warning'],
+    "Belum": COLORS['neutral']
+}
+
+RISK_STATUS_COLORS = {"Open": COLORS['danger'], "Mitigated": COLORS['success']}
+
+GRID_COLOR = '#F1F5F9'
+PROGRESS_TOP_N = 25
+
+
+@functools.cache
+def _plotly():
+    """(graph_objects, io), imported and given the ``dashboard`` template once."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    pio.templates["dashboard"] = go.layout.Template(layout=dict(
+        font=dict(size=14),
+        plot_bgcolor='white',
+        margin=dict(l=20, r=20, t=20, b=40),
+        legend=dict(orientation='h', y=1.1, font=dict(size=13)),
+        xaxis=dict(tickfont=dict(size=13)),
+        yaxis=dict(tickfont=dict(size=13), gridcolor=GRID_COLOR),
+    ))
+    return go, pio
+
+
+def content_hash(*data):
+    """Digest of the chart inputs (values, index and labels), for memoizing figures."""
+    h = hashlib.blake2b(digest_size=16)
+    for obj in data:
+        if isinstance(obj, (pd.Series, pd.DataFrame)):
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            h.update(repr(obj.columns.tolist() if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        elif isinstance(obj, np.ndarray):
+            h.update(np.ascontiguousarray(obj).tobytes())
+        else:
+            h.update(repr(obj).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _figure(data, **layout):
+    go, pio = _plotly()
+    base = pio.templates.default
+    template = "dashboard" if base in (None, "dashboard") else f"{base}+dashboard"
+    return go.Figure(data=data, layout=dict(template=template, **layout))
+
+
+def count_bars(counts, colors=None, color=COLORS['primary'], height=320, y_title=None):
+    """Bar per index value of ``counts``; ``colors`` maps index values to colors."""
+    go, _ = _plotly()
+    marker = counts.index.map(colors).tolist() if colors else color
+    return _figure(
+        [go.Bar(x=counts.index, y=counts.values, text=counts.values, textposition='outside',
+                textfont=dict(size=14), marker_color=marker)],
+        height=height,
+        xaxis=dict(title=""),
+        yaxis=dict(title=y_title),
+    )
+
+
+def workload_bars(df_workload):
+    go, _ = _plotly()
+    series = [("Completed", COLORS['success']), ("In Progress", COLORS['warning']),
+              ("Not Started", COLORS['neutral'])]
+    return _figure(
+        [go.Bar(name=name, x=df_workload['Role'], y=df_workload[name], marker_color=color,
+                text=df_workload[name], textposition='inside') for name, color in series],
+        barmode='stack', height=380, margin=dict(t=40),
+    )
+
+
+def progress_bars(df_dokumen, top_n=None):
+    """Horizontal progress per document, sorted by progress.
+
+    With ``top_n`` and more documents than that, only the ``top_n`` least
+    progressed are drawn and the rest collapse into one averaged bar on top.
+    """
+    go, _ = _plotly()
+    df = df_dokumen[['document', 'status', 'progress']].sort_values('progress', ascending=True, kind='stable')
+    labels = df['document'].astype(object)
+    progress = df['progress'].to_numpy(dtype='float64')
+    colors = df['status'].map(STATUS_COLORS).astype(object).fillna(COLORS['neutral'])
+    if top_n is not None and len(df) > top_n:
+        rest = progress[top_n:]
+        labels = pd.concat([labels.iloc[:top_n], pd.Series([f"+{len(rest)} more (avg)"], dtype=object)],
+                           ignore_index=True)
+        progress = np.append(progress[:top_n], rest.mean())
+        colors = pd.concat([colors.iloc[:top_n], pd.Series([COLORS['primary']], dtype=object)], ignore_index=True)
+    text = pd.Series(np.round(progress)).astype('int64').astype(str) + '%'
+    return _figure(
+        [go.Bar(x=progress, y=labels, orientation='h', text=text, textposition='outside',
+                textfont=dict(size=13), marker_color=colors.tolist())],
+        height=max(400, len(progress) * 45),
+        margin=dict(r=40),
+        xaxis=dict(range=[0, 115], title="Progress (%)", gridcolor=GRID_COLOR),
+        yaxis=dict(title=""),
+    )
+
+
+def risk_heatmap(matrix, levels):
+    """Probability (rows) x impact (columns) counts, both ordered by ``levels``."""
+    go, _ = _plotly()
+    return _figure(
+        [go.Heatmap(z=matrix, x=levels, y=levels, text=matrix, texttemplate="%{text}", textfont=dict(size=16),
+                    colorscale=[[0, '#F8FAFC'], [0.5, COLORS['warning']], [1, COLORS['danger']]], showscale=False,
+                    hovertemplate="Probability %{y} × Impact %{x}: %{z}<extra></extra>")],
+        height=300,
+        xaxis=dict(title="Impact (Dampak)"),
+        yaxis=dict(title="Probability (Probabilitas)", gridcolor=None),
+    )
+
+
+def scurve(periods, pv, ev, ac, upto, weekly=True):
+    """PV over all periods, EV/AC up to index ``upto``; ``ac`` may be None."""
+    go, _ = _plotly()
+    mode = 'lines+markers' if weekly else 'lines'
+    traces = [
+        go.Scatter(x=periods, y=pv, mode=mode, name='PV',
+                   line=dict(color=COLORS['neutral'], width=2, dash='dash'), marker=dict(size=8)),
+        go.Scatter(x=periods[:upto + 1], y=ev[:upto + 1], mode=mode, name='EV',
+                   line=dict(color=COLORS['primary'], width=3), marker=dict(size=8)),
+    ]
+    if ac is not None:
+        traces.append(go.Scatter(x=periods[:upto + 1], y=ac[:upto + 1], mode=mode, name='AC',
+                                 line=dict(color=COLORS['danger'], width=2), marker=dict(size=8)))
+    return _figure(
+        traces,
+        height=420, margin=dict(t=40),
+        xaxis=dict(title='Week' if weekly else 'Date', gridcolor=GRID_COLOR),
+        yaxis=dict(title='Value (Rp)'),
+    )
+
+
+BUILDERS = {
+    "counts": count_bars,
+    "workload": workload_bars,
+    "progress": progress_bars,
+    "risk_heatmap": risk_heatmap,
+    "scurve": scurve,
+}
@@ -0,0 +1,77 @@
+"""Tables derived from a log snapshot and the project baseline.
+
+Everything here is a pure function of its inputs so the app can memoize the
+results per log snapshot version; returned frames are shared between
+sessions and must be treated as read-only.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard.logstore import STATUS_CODES, STATUS_ORDER
+
+LATEST_COLUMNS = ["timestamp", "notes", "updated_by"]
+
+DocumentSummary = namedtuple("DocumentSummary", ["documents", "role_status", "status_count", "role_count",
+                                                 "workload", "avg_progress"])
+WeekSummary = namedtuple("WeekSummary", ["overdue", "overdue_df"])
+
+
+def get_latest_status(df_log, latest, df_baseline):
+    """Join each baseline document with its newest log row.
+
+    ``latest`` maps document -> row position in ``df_log`` (see
+    ``LatestIndex``), so this is O(documents) regardless of log length.
+    """
+    df_result = df_baseline.copy()
+    positions = np.fromiter((latest.get(doc, -1) for doc in df_result["document"]),
+                            dtype=np.int64, count=len(df_result))
+    found = positions >= 0
+    if not found.any():
+        df_result["status"] = pd.Categorical(["Belum"] * len(df_result), categories=STATUS_ORDER)
+        df_result["progress"] = 0
+        return df_result
+
+    cols = ["status", "progress"] + [c for c in LATEST_COLUMNS if c in df_log.columns]
+    rows = (df_log.iloc[positions[found]][cols]
+            .set_axis(df_result.index[found])
+            .reindex(df_result.index))
+    df_result["status"] = rows["status"].fillna("Belum")
+    df_result["progress"] = rows["progress"].fillna(0)
+    for col in cols[2:]:
+        df_result[col] = rows[col]
+    return df_result
+
+
+def role_status_matrix(df_dokumen, roles):
+    """Role x status document counts in one pass, team roles first."""
+    roles = list(dict.fromkeys([*roles, *df_dokumen["pic_role"].dropna().unique()]))
+    matrix = pd.crosstab(pd.Categorical(df_dokumen["pic_role"], categories=roles),
+                         pd.Categorical(df_dokumen["status"], categories=STATUS_ORDER),
+                         dropna=False)
+    matrix.index = matrix.index.astype(object)
+    matrix.columns = matrix.columns.astype(object)
+    return matrix.reindex(index=roles, columns=STATUS_ORDER, fill_value=0).rename_axis(index="Role", columns=None)
+
+
+def summarize_documents(df_dokumen, roles):
+    role_status = role_status_matrix(df_dokumen, roles)
+    role_count = role_status.sum(axis=1)
+    workload = (role_status.loc[list(roles), ["Selesai", "Proses", "Belum"]]
+                .rename(columns={"Selesai": "Completed", "Proses": "In Progress", "Belum": "Not Started"})
+                .reset_index())
+    return DocumentSummary(
+        documents=df_dokumen,
+        role_status=role_status,
+        status_count=role_status.sum(axis=0),
+        role_count=role_count[role_count > 0].sort_index(),
+        workload=workload,
+        avg_progress=float(df_dokumen["progress"].mean()),
+    )
+
+
+def summarize_week(df_dokumen, week):
+    overdue = (week > df_dokumen["target_week"]) & (df_dokumen["status"].cat.codes != STATUS_CODES["Selesai"])
+    return WeekSummary(overdue=overdue, overdue_df=df_dokumen[overdue])
+
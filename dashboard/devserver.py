@@ -0,0 +1,94 @@
+"""Local HTTP stand-in for the published sheet, used by the benchmarks.
+
+Serves fixed CSV bodies with ETag/Last-Modified validators, honours
+conditional requests, optionally injects latency and counts the bytes it
+sent so refresh strategies can be compared. A body put under a path with a
+query (``/pub?gid=1&output=csv``) is served for exactly that URL, so one
+stand-in can play several tabs of a sheet; otherwise the query is ignored.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandIn:
+    def __init__(self):
+        self.bodies = {}
+        self.latency = {}
+        self.bytes_sent = 0
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def put(self, path, body, latency=0.0):
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        with self._lock:
+            self.bodies[path] = (body, etag, formatdate(usegmt=True))
+            self.latency[path] = latency
+
+    def reset_counters(self):
+        with self._lock:
+            self.bytes_sent = self.requests = self.not_modified = 0
+
+
+def _handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            path = self.path if self.path in state.bodies else self.path.split("?", 1)[0]
+            entry = state.bodies.get(path)
+            delay = state.latency.get(path, 0.0)
+            if delay:
+                time.sleep(delay)
+            with state._lock:
+                state.requests += 1
+            if entry is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body, etag, modified = entry
+            if self.headers.get("If-None-Match") == etag:
+                with state._lock:
+                    state.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modified)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up waiting (an injected latency past its timeout).
+                return
+            with state._lock:
+                state.bytes_sent += len(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def serve():
+    state = StandIn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,144 @@
+"""Earned value series derived from the baseline, the activity log and a cost log.
+
+Everything is computed for all periods at once so the EVM tab only indexes
+into the returned arrays:
+
+* PV: each baseline document's ``budget`` is planned evenly over its
+  ``start_week``..``target_week`` periods (``start_week`` defaults to
+  ``target_week``); per-period planned spend is built with a difference
+  array and accumulated with ``cumsum``.
+* EV: a document x period matrix of the latest logged progress as of each
+  period boundary (carried forward), weighted by budget.
+* AC: cost entries bucketed per period and accumulated with ``cumsum``.
+
+Periods are project weeks (by the log's ``week_no``) or days since the
+project start (by ``timestamp``).
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard.logstore import normalize_columns, shared_document_codes
+
+GRANULARITIES = {"week": 7, "day": 1}
+
+COST_RENAME_MAP = {"tanggal": "timestamp", "date": "timestamp", "amount": "cost", "biaya": "cost"}
+
+EVMSeries = namedtuple("EVMSeries", ["granularity", "periods", "bac", "pv", "ev", "ac", "has_costs",
+                                     "sv", "cv", "spi", "cpi", "eac"])
+
+
+def parse_costs(f):
+    """Read a cost log (``timestamp`` and/or ``week_no``, ``cost``) from a CSV file object."""
+    df = normalize_columns(pd.read_csv(f))
+    df = df.set_axis([COST_RENAME_MAP.get(c, c) for c in df.columns], axis=1)
+    if "cost" not in df.columns:
+        raise ValueError("Missing columns: {'cost'}")
+    df["cost"] = pd.to_numeric(df["cost"], errors="coerce")
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    if "week_no" in df.columns:
+        df["week_no"] = pd.to_numeric(df["week_no"], errors="coerce")
+    return df.dropna(subset=["cost"]).reset_index(drop=True)
+
+
+def costs_from_log(df_log):
+    """Cost entries carried in the activity log's own ``cost`` column, if it has one."""
+    if "cost" not in df_log.columns:
+        return None
+    cols = [c for c in ["timestamp", "week_no"] if c in df_log.columns]
+    df = df_log[cols].assign(cost=pd.to_numeric(df_log["cost"], errors="coerce"))
+    return df.dropna(subset=["cost"])
+
+
+def _budgets(df_baseline):
+    if "budget" not in df_baseline.columns:
+        return np.zeros(len(df_baseline))
+    return pd.to_numeric(df_baseline["budget"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+
+
+def _period_index(df, start, granularity, n):
+    """Period of each row, or -1 where it can't be placed in 0..n-1."""
+    if granularity == "week" and "week_no" in df.columns:
+        period = df["week_no"].to_numpy(dtype="float64", na_value=np.nan) - 1
+    else:
+        days = (df["timestamp"] - pd.Timestamp(start)).dt.days.to_numpy(dtype="float64", na_value=np.nan)
+        period = np.floor(days / GRANULARITIES[granularity])
+    period = np.where(np.isnan(period), -1, period).astype(np.int64)
+    period[(period < 0) | (period >= n)] = -1
+    return period
+
+
+def planned_value(df_baseline, n, granularity="week"):
+    per_week = GRANULARITIES["week"] // GRANULARITIES[granularity]
+    budget = _budgets(df_baseline)
+    end = df_baseline["target_week"].to_numpy(dtype=np.int64)
+    begin = end
+    if "start_week" in df_baseline.columns:
+        begin = df_baseline["start_week"].fillna(df_baseline["target_week"]).to_numpy(dtype=np.int64)
+    first = np.clip((np.minimum(begin, end) - 1) * per_week, 0, n)
+    last = np.clip(end * per_week, 0, n)
+    rate = np.divide(budget, last - first, out=np.zeros_like(budget), where=last > first)
+    delta = np.zeros(n + 1)
+    np.add.at(delta, first, rate)
+    np.add.at(delta, last, -rate)
+    return np.cumsum(np.cumsum(delta[:n]))
+
+
+def progress_matrix(df_log, documents, start, n, granularity="week"):
+    """Documents x periods matrix of the latest progress (0..1) as of each period's end."""
+    matrix = np.full((len(documents), n), np.nan)
+    if len(df_log) and len(documents):
+        doc = shared_document_codes(df_log, documents)
+        period = _period_index(df_log, start, granularity, n)
+        keys = df_log["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64").copy()
+        # Like LatestIndex: rows without a timestamp rank last, ties go to the later row.
+        keys[keys == np.iinfo(np.int64).min] = np.iinfo(np.int64).max
+        keep = (doc >= 0) & (period >= 0)
+        doc, period, keys = doc[keep], period[keep], keys[keep]
+        progress = df_log["progress"].to_numpy(dtype="float64", na_value=np.nan)[keep]
+        order = np.lexsort((np.arange(len(doc)), keys, period, doc))
+        cell = doc[order] * n + period[order]
+        last = np.append(cell[1:] != cell[:-1], True)
+        matrix.flat[cell[last]] = progress[order][last]
+    # Carry each document's last known progress forward across periods.
+    valid = ~np.isnan(matrix)
+    source = np.maximum.accumulate(np.where(valid, np.arange(n), -1), axis=1)
+    filled = np.take_along_axis(matrix, np.maximum(source, 0), axis=1)
+    return np.where(source >= 0, np.nan_to_num(filled) / 100, 0.0)
+
+
+def actual_cost(df_costs, start, n, granularity="week"):
+    if df_costs is None or not len(df_costs):
+        return np.zeros(n)
+    period = _period_index(df_costs, start, granularity, n)
+    keep = period >= 0
+    costs = df_costs["cost"].to_numpy(dtype="float64", na_value=0)[keep]
+    return np.cumsum(np.bincount(period[keep], weights=costs, minlength=n))
+
+
+def compute_evm(df_baseline, df_log, df_costs, start, weeks, granularity="week"):
+    """PV/EV/AC and the derived SV/CV/SPI/CPI/EAC for every period of ``weeks`` weeks."""
+    n = weeks * GRANULARITIES["week"] // GRANULARITIES[granularity]
+    budget = _budgets(df_baseline)
+    bac = float(budget.sum())
+    pv = planned_value(df_baseline, n, granularity)
+    ev = budget @ progress_matrix(df_log, df_baseline["document"].tolist(), start, n, granularity)
+    ac = actual_cost(df_costs, start, n, granularity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spi = np.where(pv > 0, ev / pv, 0.0)
+        cpi = np.where(ac > 0, ev / ac, 0.0)
+        eac = np.where(cpi > 0, bac / cpi, bac)
+    if granularity == "week":
+        periods = np.arange(1, n + 1)
+    else:
+        periods = pd.date_range(pd.Timestamp(start), periods=n, freq="D").to_numpy()
+    return EVMSeries(granularity, periods, bac, pv, ev, ac, df_costs is not None and len(df_costs) > 0,
+                     ev - pv, ev - ac, spi, cpi, eac)
+
+
+def period_at_week(series, week):
+    """Index of the last period in ``week`` (1-based)."""
+    per_week = GRANULARITIES["week"] // GRANULARITIES[series.granularity]
+    return min(len(series.pv), week * per_week) - 1
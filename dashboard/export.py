@@ -0,0 +1,108 @@
+"""CSV/Excel export of dashboard tables, written a chunk of rows at a time.
+
+Tables are passed as an iterable of DataFrame chunks (see ``iter_chunks``),
+so an export of the whole log never holds more than ``CHUNK_ROWS`` converted
+rows: CSV chunks are appended to the file, Excel rows go through openpyxl's
+write-only mode, which streams each row to disk. Exports are written to
+temp files on a small shared thread pool; the caller still waits for its
+file, but however many sessions click at once, only ``EXPORT_WORKERS``
+exports hold a chunk in memory at a time.
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+EXPORT_WORKERS = 2
+# Excel's row limit, less the header; longer tables continue on another sheet.
+SHEET_ROWS = 1_048_575
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+
+def iter_chunks(frame, positions=None, chunk_rows=CHUNK_ROWS):
+    """``frame`` (or its rows at ``positions``, in that order) ``chunk_rows`` rows at a time."""
+    n = len(frame) if positions is None else len(positions)
+    if not n:
+        yield frame.iloc[:0]
+    for start in range(0, n, chunk_rows):
+        if positions is None:
+            yield frame.iloc[start:start + chunk_rows]
+        else:
+            yield frame.iloc[positions[start:start + chunk_rows]]
+
+
+def _cell_rows(chunk):
+    # Plain Python values with None for missing cells, which openpyxl writes as empty.
+    cells = chunk.astype(object)
+    return cells.where(chunk.notna().to_numpy(), None).itertuples(index=False, name=None)
+
+
+def write_csv(path, chunks):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=i == 0, index=False)
+
+
+def write_xlsx(path, chunks, sheet="Sheet1", sheet_rows=SHEET_ROWS):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws, header, written = None, None, 0
+    for chunk in chunks:
+        header = header or [str(c) for c in chunk.columns]
+        for row in _cell_rows(chunk):
+            if ws is None or written == sheet_rows:
+                ws = wb.create_sheet(sheet[:31] if ws is None else f"{sheet[:26]} ({len(wb.worksheets) + 1})")
+                ws.append(header)
+                written = 0
+            ws.append(row)
+            written += 1
+    if ws is None:
+        wb.create_sheet(sheet[:31]).append(header or [])
+    wb.save(path)
+
+
+def write_table(path, fmt, chunks, sheet="Sheet1"):
+    if fmt == "csv":
+        write_csv(path, chunks)
+    elif fmt == "xlsx":
+        write_xlsx(path, chunks, sheet)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_pool(workers=EXPORT_WORKERS):
+    return ThreadPoolExecutor(workers, thread_name_prefix="export")
+
+
+def export_table(pool, fmt, make_chunks, sheet="Sheet1"):
+    """Write ``make_chunks()`` as ``fmt`` on ``pool`` into a temp file; returns its bytes.
+
+    Blocks the calling thread (Streamlit's download handler) until the file
+    is written; the pool only bounds how many exports run concurrently.
+    """
+    fd, path = tempfile.mkstemp(suffix=FORMATS[fmt][1])
+    os.close(fd)
+    try:
+        pool.submit(lambda: write_table(path, fmt, make_chunks(), sheet)).result()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+
+def evm_table(series):
+    """EVM series as one row per period."""
+    return pd.DataFrame({
+        "period": series.periods,
+        "pv": series.pv, "ev": series.ev, "ac": series.ac if series.has_costs else np.nan,
+        "sv": series.sv, "cv": series.cv if series.has_costs else np.nan,
+        "spi": series.spi, "cpi": series.cpi if series.has_costs else np.nan, "eac": series.eac,
+    })
@@ -0,0 +1,112 @@
+"""Conditional fetching of log sources over a shared keep-alive pool.
+
+Bodies are handed back as binary file objects: HTTP responses are streamed
+into a spooled temporary file (in memory up to ``SPOOL_BYTES``, on disk
+beyond) so a large export is never held in memory as one bytes object.
+
+A changed body comes back with its new validators in ``FetchResult``; the
+caller saves them (``source.validators = result.validators``) only once the
+body has been processed, so a body that failed to ingest is fetched again
+instead of being answered with a 304.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FETCH_TIMEOUT = 30
+SPOOL_BYTES = 8 << 20
+
+FetchResult = namedtuple("FetchResult", ["body", "changed", "status", "nbytes", "elapsed", "validators"])
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+class HttpSource:
+    """Revalidating HTTP source: unchanged bodies come back as a 304 with no payload."""
+
+    def __init__(self, url, validators=None, timeout=FETCH_TIMEOUT, session=None):
+        self.url = url
+        self.validators = dict(validators or {})
+        self.timeout = timeout
+        self.session = session
+
+    def fetch(self, conditional=True):
+        headers = {}
+        if conditional:
+            if self.validators.get("etag"):
+                headers["If-None-Match"] = self.validators["etag"]
+            if self.validators.get("last_modified"):
+                headers["If-Modified-Since"] = self.validators["last_modified"]
+        started = time.perf_counter()
+        session = self.session or get_session()
+        with session.get(self.url, headers=headers, timeout=self.timeout, stream=True) as resp:
+            if resp.status_code == 304:
+                return FetchResult(None, False, 304, 0, time.perf_counter() - started, self.validators)
+            resp.raise_for_status()
+            body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+            try:
+                for block in resp.iter_content(chunk_size=1 << 20):
+                    body.write(block)
+            except Exception:
+                body.close()
+                raise
+            nbytes = body.tell()
+            body.seek(0)
+            validators = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+        return FetchResult(body, True, resp.status_code, nbytes, time.perf_counter() - started, validators)
+
+
+class FileSource:
+    """Local file source, revalidated on size and mtime."""
+
+    def __init__(self, path, validators=None):
+        self.path = path
+        self.validators = dict(validators or {})
+
+    def fetch(self, conditional=True):
+        started = time.perf_counter()
+        st = os.stat(self.path)
+        stamp = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        if conditional and self.validators == stamp:
+            return FetchResult(None, False, 304, 0, time.perf_counter() - started, stamp)
+        return FetchResult(open(self.path, "rb"), True, 200, st.st_size, time.perf_counter() - started, stamp)
+
+
+def local_path(url):
+    """Filesystem path behind ``url``, or None for http(s) sources."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https"):
+        return None
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    return url
+
+
+def open_source(url, validators=None):
+    path = local_path(url)
+    if path is None:
+        return HttpSource(url, validators)
+    return FileSource(path, validators)
@@ -0,0 +1,183 @@
+"""Event-sourced document history for "as of" queries over the log.
+
+Every log row is an event (timestamp, row position, document). Events are
+kept sorted by timestamp, and every ``CHECKPOINT_EVENTS`` events a
+checkpoint records the newest row position per document up to that point.
+An as-of query starts from the nearest checkpoint and replays at most
+``CHECKPOINT_EVENTS`` events, so its cost doesn't grow with the history.
+
+Ordering matches ``LatestIndex``: rows without a timestamp rank last (they
+only show up in "now"), and ties go to the later row.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.buffer import extend, reserve
+
+CHECKPOINT_EVENTS = 4096
+
+_NAT = np.iinfo(np.int64).min
+_LAST = np.iinfo(np.int64).max
+
+
+def _pad(state, n):
+    if len(state) >= n:
+        return state.copy()
+    return np.concatenate([state, np.full(n - len(state), -1, dtype=np.int64)])
+
+
+def _apply(state, docs, positions):
+    """Set each document's row to its last event in ``docs``/``positions``."""
+    if len(docs):
+        reverse = docs[::-1]
+        codes, first = np.unique(reverse, return_index=True)
+        state[codes] = positions[::-1][first]
+    return state
+
+
+def timestamp_key(ts):
+    return pd.Timestamp(ts).as_unit("ns").value
+
+
+class HistoryIndex:
+    """Sorted event log plus checkpoints, updated one delta at a time.
+
+    A delta that is newer than everything seen so far (the usual append) is
+    written in place after the existing events, like ``ColumnBuffer`` rows.
+    Older rows are buffered and merged when a view is taken, or sooner once
+    they are a quarter of the log: they are inserted into the sorted log and
+    drop the checkpoints after the earliest change.
+    """
+
+    def __init__(self, every=CHECKPOINT_EVENTS):
+        self.every = every
+        self._codes = {}
+        self._documents = []
+        self._n = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._positions = np.empty(0, dtype=np.int64)
+        self._docs = np.empty(0, dtype=np.int32)
+        self._checkpoints = [np.empty(0, dtype=np.int64)]
+        # Events before this one are covered by the checkpoints.
+        self._checked = 0
+        self._pending = []
+        self._waiting = 0
+
+    def update(self, delta, offset):
+        if not len(delta):
+            return
+        keys = delta["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64").copy()
+        keys[keys == _NAT] = _LAST
+        codes, documents = pd.factorize(delta["document"].to_numpy(dtype=object))
+        mapping = np.fromiter((self._code(doc) for doc in documents), dtype=np.int32, count=len(documents))
+        # Stable, and positions increase within the delta: ties stay in row order.
+        order = np.argsort(keys, kind="stable")
+        keys, positions, docs = keys[order], offset + order, mapping[codes][order]
+        # New rows always have later positions, so they sort after old events with the same key.
+        if self._pending or (self._n and keys[0] < self._keys[self._n - 1]):
+            self._pending.append((keys, positions, docs))
+            self._waiting += len(keys)
+            # Merge once the backlog is a fair share of the log: bounded memory, amortized cost.
+            if self._waiting > self._n // 4:
+                self._merge()
+            return
+        n = self._n
+        self._keys = extend(self._keys, n, keys)
+        self._positions = extend(self._positions, n, positions)
+        self._docs = extend(self._docs, n, docs)
+        self._n = n + len(keys)
+
+    def reserve(self, rows):
+        """Make room for ``rows`` more in-order events up front."""
+        size = self._n + rows
+        self._keys = reserve(self._keys, self._n, size)
+        self._positions = reserve(self._positions, self._n, size)
+        self._docs = reserve(self._docs, self._n, size)
+
+    def view(self):
+        if self._pending:
+            self._merge()
+        if self._checked < self._n:
+            self._checkpoint()
+        n = self._n
+        return HistoryView(self._keys[:n], self._positions[:n], self._docs[:n], tuple(self._checkpoints),
+                           tuple(self._documents), self.every)
+
+    def state(self):
+        """(arrays, JSON info) to persist; checkpoints are concatenated with their lengths."""
+        view = self.view()
+        checkpoints = self._checkpoints
+        return ({"keys": view.keys, "positions": view.positions, "docs": view.docs,
+                 "checkpoints": np.concatenate(checkpoints),
+                 "checkpoint_sizes": np.array([len(c) for c in checkpoints], dtype=np.int64)},
+                {"documents": self._documents, "every": self.every})
+
+    @classmethod
+    def from_state(cls, arrays, info):
+        index = cls(info["every"])
+        for doc in info["documents"]:
+            index._code(doc)
+        index._keys, index._positions, index._docs = arrays["keys"], arrays["positions"], arrays["docs"]
+        index._n = index._checked = len(index._keys)
+        bounds = np.cumsum(arrays["checkpoint_sizes"])
+        index._checkpoints = np.split(arrays["checkpoints"], bounds[:-1])
+        return index
+
+    def _code(self, doc):
+        code = self._codes.get(doc)
+        if code is None:
+            code = self._codes[doc] = len(self._documents)
+            self._documents.append(doc)
+        return code
+
+    def _merge(self):
+        n = self._n
+        keys, positions, docs = (np.concatenate(parts) for parts in zip(*self._pending))
+        self._pending = []
+        self._waiting = 0
+        # Parts arrive in row order, so a stable sort keeps ties in row order; they
+        # go after existing events with the same key, whose rows are all earlier.
+        order = np.argsort(keys, kind="stable")
+        keys, positions, docs = keys[order], positions[order], docs[order]
+        at = np.searchsorted(self._keys[:n], keys, side="right")
+        # One array at a time, so only one old copy is alive next to the merged one.
+        self._keys = np.insert(self._keys[:n], at, keys)
+        self._positions = np.insert(self._positions[:n], at, positions)
+        self._docs = np.insert(self._docs[:n], at, docs)
+        self._n = n + len(keys)
+        self._checked = min(self._checked, int(at[0]))
+
+    def _checkpoint(self):
+        checkpoints = self._checkpoints[:self._checked // self.every + 1]
+        every, n_docs = self.every, len(self._documents)
+        for c in range(len(checkpoints), self._n // every + 1):
+            events = slice((c - 1) * every, c * every)
+            checkpoints.append(_apply(_pad(checkpoints[-1], n_docs), self._docs[events], self._positions[events]))
+        self._checkpoints = checkpoints
+        self._checked = self._n
+
+
+class HistoryView:
+    """Immutable snapshot of a ``HistoryIndex``; arrays are shared and read-only."""
+
+    def __init__(self, keys=None, positions=None, docs=None, checkpoints=(), documents=(),
+                 every=CHECKPOINT_EVENTS):
+        self.keys = np.empty(0, dtype=np.int64) if keys is None else keys
+        self.positions = np.empty(0, dtype=np.int64) if positions is None else positions
+        self.docs = np.empty(0, dtype=np.int32) if docs is None else docs
+        self.checkpoints = checkpoints or (np.empty(0, dtype=np.int64),)
+        self.documents = documents
+        self.every = every
+
+    def positions_as_of(self, ts=None):
+        """document -> row position of its newest entry before ``ts`` (all rows if None).
+
+        Same shape as ``LatestIndex.positions()``, so it can feed
+        ``get_latest_status`` directly.
+        """
+        end = len(self.keys) if ts is None else int(np.searchsorted(self.keys, timestamp_key(ts), side="left"))
+        c = min(end // self.every, len(self.checkpoints) - 1)
+        start = c * self.every
+        state = _apply(_pad(self.checkpoints[c], len(self.documents)), self.docs[start:end], self.positions[start:end])
+        found = np.flatnonzero(state >= 0)
+        return {self.documents[i]: int(state[i]) for i in found}
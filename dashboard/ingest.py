@@ -0,0 +1,100 @@
+"""Local append endpoint for pushing log rows instead of polling the sheet.
+
+``POST /append/<project>`` with CSV rows appends them to that project's
+local log file and wakes its refresher, so the new rows are ingested (as a
+delta) right away rather than on the next poll. The first line may repeat
+the file's header; a new file takes the header from the first request::
+
+    curl --data-binary @rows.csv http://127.0.0.1:8765/append/office-supplies
+
+Each request is one ``O_APPEND`` write of whole lines under an exclusive
+``flock``, so the log store never reads a half-written row from us and
+concurrent pushes don't interleave. Without ``fcntl`` (Windows) only pushes
+within this process are serialized.
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, see the module docstring
+    fcntl = None
+
+MAX_BODY = 16 << 20
+
+_append_lock = threading.Lock()
+
+
+def append_rows(path, body):
+    """Append CSV ``body`` to ``path``; returns (data rows written, (start, stop) of the bytes written)."""
+    lines = body.replace(b"\r\n", b"\n").split(b"\n")
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return 0, None
+    with _append_lock:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            prefix = b""
+            if size:
+                with open(path, "rb") as f:
+                    header = f.readline().rstrip(b"\r\n")
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        prefix = b"\r\n"
+                if lines[0].rstrip(b"\r") == header:
+                    lines = lines[1:]
+            rows = len(lines) if size else len(lines) - 1
+            if not lines:
+                return rows, None
+            data = prefix + b"\r\n".join(lines) + b"\r\n"
+            os.write(fd, data)
+            return rows, (size, size + len(data))
+        finally:
+            os.close(fd)
+
+
+def _handler(resolve, on_append):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            parts = self.path.split("?", 1)[0].strip("/").split("/")
+            path = resolve(parts[1]) if len(parts) == 2 and parts[0] == "append" else None
+            if path is None:
+                return self._reply(404, {"error": "unknown project"})
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                return self._reply(413, {"error": "body too large"})
+            rows, span = append_rows(path, self.rfile.read(length))
+            if rows:
+                on_append(parts[1], *span)
+            self._reply(202, {"appended": rows})
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_ingest_server(resolve, on_append, host="127.0.0.1", port=0):
+    """Serve appends on a daemon thread; returns the server (``server_address`` has the port).
+
+    ``resolve(project)`` maps a project key to its local log path, or None
+    if it can't take pushes; ``on_append(project, start, stop)`` runs after
+    rows land, with the byte range they were written to.
+    """
+    server = ThreadingHTTPServer((host, port), _handler(resolve, on_append))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="log-ingest", daemon=True).start()
+    return server
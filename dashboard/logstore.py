@@ -0,0 +1,714 @@
+"""Incremental ingestion of the published activity log.
+
+The published sheet is an append-only CSV, so instead of re-parsing the whole
+export on every refresh the store remembers how many bytes it has already
+ingested (plus a digest of them) and only parses what was appended since.
+Bytes the ingest endpoint reports having appended itself (``appended``)
+are trusted not to touch that prefix, so a push doesn't re-hash all of it.
+The export doesn't end with a newline, so its last row is kept apart as
+the "tail": it only counts as unchanged if its bytes are still there and
+now end in a line break, since an edit to the last row leaves the old bytes
+a prefix of the new ones.
+Normalized rows are persisted as uncompressed Arrow IPC segments that are
+memory-mapped on load, so a restarted worker (or another replica pointed at
+the same cache directory) picks up where the previous one stopped without
+touching CSV text. A store restored from several segments is compacted
+into one first, since concatenating them would copy every mapped page. The row indexes (latest, per-week, history) are saved
+next to them as ``.npy`` arrays whenever the store is rebuilt or compacted;
+a restore memory-maps those and only indexes the rows appended since.
+
+Sources are read as file objects and parsed ``CHUNK_ROWS`` rows at a time
+into a ``ColumnBuffer``, so peak memory is the normalized log plus one chunk
+rather than a multiple of the CSV size.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+from pandas.api.types import union_categoricals
+
+try:
+    import fcntl
+except ImportError:  # Windows: replicas sharing a cache dir are not supported there
+    fcntl = None
+
+from dashboard.buffer import ColumnBuffer, extend
+from dashboard.fetch import open_source
+from dashboard.history import HistoryIndex
+from dashboard.timing import stage
+
+STATUS_ORDER = ["Belum", "Proses", "Selesai"]
+STATUS_CODES = {status: code for code, status in enumerate(STATUS_ORDER)}
+REQUIRED_COLUMNS = {"timestamp", "week_no", "document", "status", "progress"}
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", ".cache")
+MAX_SEGMENTS = 32
+CHUNK_ROWS = 100_000
+HASH_BLOCK = 1 << 20
+# Bump when column dtypes or the meta layout change so cached segments are rebuilt.
+SCHEMA_VERSION = 3
+CATEGORICAL_COLUMNS = ["document", "pic_role", "phase", "updated_by"]
+TYPED_COLUMNS = {"timestamp", "week_start", "week_no", "progress", "status", *CATEGORICAL_COLUMNS}
+
+
+RENAME_MAP = {
+    "week": "week_no", "mingguke": "week_no", "minggu_ke": "week_no",
+    "doc": "document", "nama dokumen": "document",
+    "fase": "phase", "pic": "pic_role", "role": "pic_role",
+    "updatedby": "updated_by", "catatan": "notes",
+}
+
+
+def normalize_columns(df):
+    columns = [c.strip().lower() for c in df.columns]
+    return df.set_axis([RENAME_MAP.get(c, c) for c in columns], axis=1)
+
+
+def normalize_log(df):
+    df = normalize_columns(df)
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    if "week_start" in df.columns:
+        df["week_start"] = pd.to_datetime(df["week_start"], errors="coerce")
+    df["week_no"] = pd.to_numeric(df["week_no"], errors="coerce")
+    df["progress"] = pd.to_numeric(df["progress"], errors="coerce")
+    df["status"] = df["status"].astype(str).str.strip().str.title()
+    df.loc[~df["status"].isin(STATUS_ORDER), "status"] = "Proses"
+    df["document"] = df["document"].astype(str).str.strip()
+    df = df.dropna(subset=["week_no", "document"]).reset_index(drop=True)
+    return apply_dtypes(df)
+
+
+def read_log_chunks(f, chunksize=CHUNK_ROWS, names=None):
+    reader = pd.read_csv(f, chunksize=chunksize,
+                         header=None if names else "infer", names=names)
+    with reader:
+        for chunk in reader:
+            with stage("normalize_log"):
+                chunk = normalize_log(chunk)
+            yield chunk
+
+
+def apply_dtypes(df):
+    df["week_no"] = df["week_no"].round().astype("int16")
+    df["progress"] = df["progress"].astype("float32")
+    df["status"] = pd.Categorical(df["status"], categories=STATUS_ORDER)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in df.columns:
+        if col not in TYPED_COLUMNS:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def concat_logs(frames):
+    frames = [f for f in frames if f is not None]
+    if len(frames) > 1:
+        frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            parts = [f[col] for f in frames]
+            if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+                df[col] = union_categoricals(parts)
+            else:
+                df[col] = df[col].astype("category")
+    return df
+
+
+def shared_document_codes(df_log, documents):
+    """Codes of ``df_log["document"]`` in ``documents`` (-1 elsewhere).
+
+    Uses the log's own codes when its dictionary starts with ``documents``
+    (a store seeded with them), else recodes by value.
+    """
+    column = df_log["document"]
+    target = pd.Index(documents)
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return target.get_indexer(column).astype(np.int64)
+    categories = column.cat.categories
+    codes = column.cat.codes.to_numpy().astype(np.int64)
+    n = len(target)
+    if len(categories) >= n and (categories[:n] == target.astype(categories.dtype)).all():
+        codes[codes >= n] = -1
+        return codes
+    # Missing values (code -1) pick the trailing -1.
+    return np.append(target.get_indexer(categories), -1)[codes]
+
+
+class LatestIndex:
+    """Row position of the newest entry per document, updated one delta at a time.
+
+    Ordering matches ``sort_values("timestamp").groupby("document").tail(1)``:
+    rows without a timestamp sort last and ties go to the later row.
+    """
+
+    def __init__(self):
+        self._rows = {}
+
+    def update(self, delta, offset):
+        if not len(delta):
+            return
+        keys = delta["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64").copy()
+        keys[keys == np.iinfo(np.int64).min] = np.iinfo(np.int64).max
+        newest = (pd.DataFrame({"document": delta["document"].astype(object).to_numpy(),
+                                "key": keys, "pos": np.arange(offset, offset + len(delta))})
+                  .sort_values(["key", "pos"], kind="stable")
+                  .drop_duplicates("document", keep="last"))
+        rows = self._rows
+        for doc, key, pos in zip(newest["document"], newest["key"], newest["pos"]):
+            current = rows.get(doc)
+            if current is None or key >= current[0]:
+                rows[doc] = (key, pos)
+
+    def positions(self):
+        return {doc: pos for doc, (_, pos) in self._rows.items()}
+
+    def state(self):
+        """(arrays, JSON info) to persist; see ``from_state``."""
+        documents = list(self._rows)
+        keys, positions = (np.array([self._rows[doc][i] for doc in documents], dtype=np.int64) for i in (0, 1))
+        return {"keys": keys, "positions": positions}, {"documents": documents}
+
+    @classmethod
+    def from_state(cls, arrays, info):
+        index = cls()
+        index._rows = {doc: (int(key), int(pos))
+                       for doc, key, pos in zip(info["documents"], arrays["keys"], arrays["positions"])}
+        return index
+
+
+class WeekIndex:
+    """Per-week row positions and update/document counts, updated one delta at a time.
+
+    Each week keeps its rows sorted by timestamp (rows without one first,
+    ties in row order), so a week filter is a lookup and a page of it is a
+    slice. Rows newer than the week's last one are written in place after
+    it; older ones are kept as separate parts and merged into the week's
+    sorted run the next time a view is taken, or once they are a quarter of it.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._pending = {}
+        self._documents = {}
+
+    def update(self, delta, offset):
+        if not len(delta):
+            return
+        week = delta["week_no"].to_numpy()
+        keys = delta["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        documents = delta["document"].to_numpy(dtype=object)
+        order = np.lexsort((keys, week))
+        for run in np.split(order, np.flatnonzero(np.diff(week[order])) + 1):
+            w = int(week[run[0]])
+            self._add(w, keys[run], run + offset)
+            self._documents.setdefault(w, set()).update(pd.unique(documents[run]))
+
+    def _add(self, w, keys, positions):
+        run = self._runs.setdefault(w, [np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0])
+        n = run[2]
+        if w in self._pending or (n and keys[0] < run[0][n - 1]):
+            parts = self._pending.setdefault(w, [])
+            parts.append((keys, positions))
+            # Like HistoryIndex: merge once the backlog is a quarter of the week.
+            if sum(len(k) for k, _ in parts) > n // 4:
+                self._merge(w)
+            return
+        run[0] = extend(run[0], n, keys)
+        run[1] = extend(run[1], n, positions)
+        run[2] = n + len(keys)
+
+    def _merge(self, w):
+        run, parts = self._runs[w], self._pending.pop(w)
+        keys, positions = np.concatenate([k for k, _ in parts]), np.concatenate([p for _, p in parts])
+        # As in HistoryIndex._merge: parts are in row order and come after existing ties.
+        order = np.argsort(keys, kind="stable")
+        at = np.searchsorted(run[0][:run[2]], keys[order], side="right")
+        run[0] = np.insert(run[0][:run[2]], at, keys[order])
+        run[1] = np.insert(run[1][:run[2]], at, positions[order])
+        run[2] = len(run[0])
+
+    def view(self):
+        for w in list(self._pending):
+            self._merge(w)
+        runs = {w: (keys[:n], positions[:n]) for w, (keys, positions, n) in self._runs.items()}
+        return WeekView(runs, {w: frozenset(docs) for w, docs in self._documents.items()})
+
+    def state(self):
+        """(arrays, JSON info) to persist: every week's sorted run, in week order.
+
+        Keys and positions are lists of per-week parts, saved back to back as one array.
+        """
+        runs = self.view().runs
+        weeks = list(runs)
+        bounds = np.cumsum([0] + [len(runs[w][1]) for w in weeks]).astype(np.int64)
+        return ({"keys": [runs[w][0] for w in weeks], "positions": [runs[w][1] for w in weeks], "bounds": bounds},
+                {"weeks": weeks, "documents": [sorted(self._documents[w]) for w in weeks]})
+
+    @classmethod
+    def from_state(cls, arrays, info):
+        index = cls()
+        keys, positions, bounds = arrays["keys"], arrays["positions"], arrays["bounds"]
+        for i, w in enumerate(info["weeks"]):
+            lo, hi = bounds[i], bounds[i + 1]
+            index._runs[w] = [keys[lo:hi], positions[lo:hi], int(hi - lo)]
+            index._documents[w] = set(info["documents"][i])
+        return index
+
+
+class WeekView:
+    """Immutable snapshot of a ``WeekIndex``; arrays are shared and read-only."""
+
+    def __init__(self, runs=None, documents=None):
+        self.runs = dict(sorted((runs or {}).items()))
+        self.documents = documents or {}
+
+    @property
+    def weeks(self):
+        return list(self.runs)
+
+    @property
+    def max_week(self):
+        return max(self.runs, default=None)
+
+    def run(self, week):
+        """(timestamp keys, row positions) of ``week``, oldest first."""
+        return self.runs[week]
+
+    def count(self, weeks):
+        return sum(len(self.runs[w][1]) for w in set(weeks) if w in self.runs)
+
+    def document_count(self, weeks):
+        sets = [self.documents[w] for w in set(weeks) if w in self.documents]
+        return len(frozenset().union(*sets))
+
+
+def _hash_range(f, start, stop, hasher):
+    f.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        block = f.read(min(HASH_BLOCK, remaining))
+        if not block:
+            break
+        hasher.update(block)
+        remaining -= len(block)
+    return hasher
+
+
+def _line_end(f, start, stop):
+    """Position just past the last line break in ``f[start:stop]``, else ``start``."""
+    pos = stop
+    while pos > start:
+        lo = max(start, pos - HASH_BLOCK)
+        f.seek(lo)
+        i = f.read(pos - lo).rfind(b"\n")
+        if i >= 0:
+            return lo + i + 1
+        pos = lo
+    return start
+
+
+def _save_array(path, array):
+    """``np.save``, or for a list of 1-d parts, save their concatenation without building it."""
+    with open(path, "wb") as f:
+        if not isinstance(array, list):
+            np.save(f, array)
+            return
+        dtype = array[0].dtype if array else np.dtype(np.int64)
+        np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                                                 "shape": (sum(len(part) for part in array),)})
+        for part in array:
+            f.write(np.ascontiguousarray(part, dtype=dtype).data)
+
+
+def _estimate_rows(f, start, stop):
+    """Rows in ``f[start:stop]``, extrapolated from the line breaks in its first block."""
+    f.seek(start)
+    sample = f.read(min(HASH_BLOCK, stop - start))
+    if not sample:
+        return 0
+    return (stop - start) * sample.count(b"\n") // len(sample) + 1
+
+
+def _tail(f, start, stop):
+    return {"size": stop - start, "digest": _hash_range(f, start, stop, hashlib.blake2b(digest_size=16)).hexdigest()}
+
+
+def _same_tail(f, start, tail, size):
+    # The unterminated last row is unchanged only if it was completed, not extended.
+    stop = start + tail["size"]
+    if not tail["size"]:
+        return True
+    if _tail(f, start, stop)["digest"] != tail["digest"]:
+        return False
+    f.seek(stop)
+    return size == stop or f.read(1) in (b"\r", b"\n")
+
+
+class _Window(io.RawIOBase):
+    """Read ``f`` from its current position up to ``stop`` only, so rows
+    appended to a live file while it is being parsed are left for the next
+    refresh."""
+
+    def __init__(self, f, stop):
+        self._f = f
+        self._stop = stop
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self._stop - self._f.tell())
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        b[:len(data)] = data
+        return len(data)
+
+
+@contextmanager
+def _file_lock(path):
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _empty_meta():
+    return {"schema": SCHEMA_VERSION, "offset": 0, "digest": None, "tail": {"size": 0, "digest": None},
+            "header": None, "rows": 0, "segments": [], "index": None, "version": 0, "validators": None}
+
+
+class LogStore:
+    """Append-only, persisted copy of one published log.
+
+    ``ingest`` compares the already-ingested prefix of the export (up to its
+    last line break, plus the unterminated last row) with the stored digests:
+    when they match only what follows is parsed and appended as a new
+    segment, otherwise (rows edited or deleted upstream) the store is rebuilt
+    from scratch.
+    """
+
+    def __init__(self, url, root=None, source=None, documents=()):
+        self.url = url
+        # Seeded first into the document dictionary, so these documents keep
+        # codes 0..n-1 in every frame (see ``shared_document_codes``).
+        self.documents = list(documents)
+        key = hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+        self.path = os.path.join(root or CACHE_DIR, "log", key)
+        self._lock = threading.Lock()
+        # (offset, hasher holding f[:offset]) of the last ingest, and byte spans
+        # appended by the ingest endpoint since.
+        self._hasher = None
+        self._appends = []
+        self._appends_lock = threading.Lock()
+        self._meta = _empty_meta()
+        self.frame = None
+        self._index(None)
+        self._buffer = None
+        with _file_lock(self.path):
+            self._restore()
+        self.source = source or open_source(url, self._meta.get("validators"))
+
+    @property
+    def version(self):
+        return self._meta["version"]
+
+    def view(self):
+        with self._lock:
+            return self.frame, self.version, self.latest.positions(), self.weeks.view(), self.history.view()
+
+    def refresh(self):
+        if self.frame is None:
+            with self._lock, _file_lock(self.path):
+                self._restore()
+        with stage("fetch"):
+            result = self.source.fetch(conditional=self.frame is not None)
+        if not result.changed:
+            return self.frame
+        with result.body as body, stage("ingest"):
+            frame = self.ingest(body)
+        # Only now: a body that failed to ingest must not be revalidated as unchanged.
+        self.source.validators = result.validators
+        with self._lock, _file_lock(self.path):
+            self._meta["validators"] = result.validators
+            self._write_meta()
+        return frame
+
+    def ingest(self, raw):
+        f = io.BytesIO(raw) if isinstance(raw, (bytes, bytearray)) else raw
+        with self._lock, _file_lock(self.path):
+            self._sync()
+            meta = self._meta
+            size = f.seek(0, io.SEEK_END)
+            offset, tail = meta["offset"], meta["tail"]
+            start = offset + tail["size"]
+            hasher = self._appended_only(offset, start, size)
+            if hasher is None and meta["digest"] is not None and size >= start:
+                hasher = _hash_range(f, 0, offset, hashlib.blake2b(digest_size=16))
+                if hasher.hexdigest() != meta["digest"]:
+                    hasher = None
+            if hasher is not None and _same_tail(f, offset, tail, size):
+                if size == start:
+                    return self.frame
+                end = _line_end(f, offset, size)
+                _hash_range(f, offset, end, hasher)
+                names = next(csv.reader([meta["header"]]))
+                new_tail = _tail(f, end, size)
+                rows = _estimate_rows(f, start, size)
+                f.seek(start)
+                self._append(read_log_chunks(io.BufferedReader(_Window(f, size)), names=names),
+                             hasher, end, new_tail, rows)
+            else:
+                self._rebuild(f, size)
+            return self.frame
+
+    def release(self):
+        """Drop the in-memory copy; the next refresh maps it back from disk."""
+        with self._lock:
+            self.frame = None
+            self._index(None)
+            self._buffer = None
+            self._meta = _empty_meta()
+            self._hasher = None
+
+    def _rebuild(self, f, size):
+        stale = self._meta["segments"] + [(self._meta.get("index") or {}).get("name")]
+        version = self._meta["version"]
+        self._meta = _empty_meta()
+        self._meta["version"] = version
+        self.frame = None
+        self._index(None)
+        self._buffer = None
+        f.seek(0)
+        self._meta["header"] = f.readline().decode().rstrip("\r\n")
+        end = _line_end(f, 0, size)
+        hasher = _hash_range(f, 0, end, hashlib.blake2b(digest_size=16))
+        tail = _tail(f, end, size)
+        rows = _estimate_rows(f, 0, size)
+        f.seek(0)
+        self._append(read_log_chunks(io.BufferedReader(_Window(f, size))), hasher, end, tail, rows)
+        for name in stale:
+            self._remove(name)
+
+    def appended(self, start, stop):
+        """Note that the ingest endpoint appended ``[start, stop)`` to the local log.
+
+        The next ingest then takes the prefix before it as unchanged instead of
+        re-hashing it; anything else (a watched file edited by hand, an export)
+        is still checked in full.
+        """
+        with self._appends_lock:
+            self._appends.append((start, stop))
+
+    def _appended_only(self, offset, start, size):
+        """Hasher for ``f[:offset]`` if ``f[start:size]`` is all endpoint appends, else None."""
+        with self._appends_lock:
+            spans, self._appends = sorted(self._appends), []
+            # Spans written after ``size`` was read are for the next ingest.
+            self._appends = [span for span in spans if span[1] > size]
+        if self._hasher is None or self._hasher[0] != offset:
+            return None
+        pos = start
+        for lo, hi in spans:
+            if lo == pos and hi <= size:
+                pos = hi
+        return self._hasher[1].copy() if pos == size else None
+
+    def _append(self, chunks, hasher, offset, tail, rows=0):
+        meta = self._meta
+        if self._buffer is None:
+            seeds = {"document": self.documents}
+            if self.frame is None:
+                self._buffer = ColumnBuffer()
+                self._buffer.seed_categories("document", self.documents)
+            else:
+                self._buffer = ColumnBuffer.from_frame(self.frame, seeds)
+        buffer = self._buffer
+        start = buffer.n
+        # Sized once for the whole ingest (with some slack for the estimate)
+        # instead of doubling on the way, which leaves the old and new arrays alive at once.
+        buffer.reserve(rows + rows // 16)
+        self.history.reserve(rows + rows // 16)
+        try:
+            for chunk in chunks:
+                if len(chunk):
+                    self.latest.update(chunk, buffer.n)
+                    self.weeks.update(chunk, buffer.n)
+                    self.history.update(chunk, buffer.n)
+                buffer.append(chunk)
+        except Exception:
+            # Forget the half-appended rows: rebuild buffer and indexes from the last good frame.
+            self._buffer = None
+            self._index(self.frame)
+            raise
+        self.frame = buffer.to_frame()
+        stale_index = None
+        if buffer.n > start:
+            delta = buffer.to_frame(start, buffer.n)
+            meta["segments"].append(self._write_segment(delta))
+            compacted = len(meta["segments"]) > MAX_SEGMENTS
+            if compacted:
+                self._compact()
+            if compacted or not start:
+                # Saved with a fresh or compacted store; restores catch up on later deltas.
+                stale_index = (meta.get("index") or {}).get("name")
+                meta["index"] = self._write_index()
+        meta["offset"] = offset
+        meta["digest"] = hasher.hexdigest()
+        meta["tail"] = tail
+        meta["rows"] = len(self.frame)
+        meta["version"] += 1
+        self._write_meta()
+        self._hasher = (offset, hasher)
+        self._remove(stale_index)
+
+    def _compact(self):
+        old = self._meta["segments"]
+        self._meta["segments"] = [self._write_segment(self.frame)]
+        self._write_meta()
+        for name in old:
+            self._remove(name)
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Segments written with other column dtypes are rebuilt from the source.
+        return meta if meta.get("schema") == SCHEMA_VERSION else None
+
+    def _sync(self):
+        # Another replica sharing the directory may have ingested since we last looked.
+        meta = self._read_meta()
+        if meta and (meta.get("version"), meta.get("segments")) != (self._meta["version"], self._meta["segments"]):
+            self._restore(meta)
+
+    def _restore(self, meta=None):
+        # Callers hold the file lock: a store restored from several segments is compacted.
+        meta = meta or self._read_meta()
+        try:
+            parts = [self._read_segment(name) for name in meta["segments"]]
+        except (OSError, TypeError, KeyError, pa.ArrowException):
+            return
+        if not parts:
+            return
+        self.frame = concat_logs(parts)
+        self._meta = meta
+        if len(parts) > 1:
+            # Concatenating copies the mapped segments into private memory; one
+            # compacted segment is mapped instead, so replicas share its pages.
+            self._compact()
+            self.frame = self._read_segment(self._meta["segments"][0])
+        saved = meta.get("index")
+        if not self._load_index(saved, self.frame):
+            self._index(self.frame)
+        if len(parts) > 1 and (saved or {}).get("rows") != len(self.frame):
+            # Saved with the compacted store, as ``_append`` does.
+            self._meta["index"] = self._write_index()
+            self._write_meta()
+            self._remove((saved or {}).get("name"))
+        self._buffer = None
+        self._hasher = None
+
+    def _load_index(self, saved, frame):
+        """Map the saved indexes back and index the rows after them; False if there are none."""
+        if not saved or saved["rows"] > len(frame):
+            return False
+        path = os.path.join(self.path, saved["name"])
+        try:
+            with open(os.path.join(path, "index.json")) as f:
+                info = json.load(f)
+            indexes = {}
+            for key, cls in (("latest", LatestIndex), ("weeks", WeekIndex), ("history", HistoryIndex)):
+                arrays = {name: np.load(os.path.join(path, f"{key}.{name}.npy"), mmap_mode="r")
+                          for name in info[key]["arrays"]}
+                indexes[key] = cls.from_state(arrays, info[key]["info"])
+        except (OSError, ValueError, KeyError):
+            return False
+        self.latest, self.weeks, self.history = indexes["latest"], indexes["weeks"], indexes["history"]
+        rows = saved["rows"]
+        if rows < len(frame):
+            delta = frame.iloc[rows:]
+            self.latest.update(delta, rows)
+            self.weeks.update(delta, rows)
+            self.history.update(delta, rows)
+        return True
+
+    def _write_index(self):
+        name = f"index-{self._meta['version'] + 1:08d}"
+        tmp = os.path.join(self.path, f"{name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        info = {}
+        for key, index in (("latest", self.latest), ("weeks", self.weeks), ("history", self.history)):
+            arrays, info[key] = index.state()
+            info[key] = {"arrays": list(arrays), "info": info[key]}
+            for array_name, array in arrays.items():
+                _save_array(os.path.join(tmp, f"{key}.{array_name}.npy"), array)
+        with open(os.path.join(tmp, "index.json"), "w") as f:
+            json.dump(info, f)
+        shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        os.replace(tmp, os.path.join(self.path, name))
+        return {"name": name, "rows": len(self.frame)}
+
+    def _index(self, frame):
+        self.latest = LatestIndex()
+        self.weeks = WeekIndex()
+        self.history = HistoryIndex()
+        if frame is not None:
+            self.latest.update(frame, 0)
+            self.weeks.update(frame, 0)
+            self.history.update(frame, 0)
+
+    def _read_segment(self, name):
+        table = feather.read_table(os.path.join(self.path, name), memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def _write_segment(self, df):
+        os.makedirs(self.path, exist_ok=True)
+        name = f"seg-{self._meta['version'] + 1:08d}-{len(self._meta['segments']):04d}.arrow"
+        tmp = os.path.join(self.path, f"{name}.{os.getpid()}.tmp")
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, os.path.join(self.path, name))
+        return name
+
+    def _write_meta(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = os.path.join(self.path, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _remove(self, name):
+        if name is None:
+            return
+        path = os.path.join(self.path, name)
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
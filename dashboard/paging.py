@@ -0,0 +1,60 @@
+"""Page-at-a-time views over the log and document tables.
+
+``LogPager`` reads pages of a week filter from the per-week runs the log
+store keeps sorted by timestamp (``WeekView``); a page comes from the ends of
+those runs without touching the rest of the log.
+"""
+import math
+
+import numpy as np
+
+PAGE_SIZE = 50
+
+
+def page_count(total, size=PAGE_SIZE):
+    return max(1, math.ceil(total / size))
+
+
+def paginate(df, page, size=PAGE_SIZE):
+    """Rows of ``page`` (1-based) from an already filtered/sorted frame."""
+    start = (page - 1) * size
+    return df.iloc[start:start + size]
+
+
+class LogPager:
+    def __init__(self, df_log, weeks):
+        self.frame = df_log
+        self.weeks = weeks
+
+    def page(self, weeks, page, size=PAGE_SIZE, newest_first=True):
+        """Rows ``page`` (1-based) of ``weeks`` ordered by timestamp.
+
+        Each week run is already sorted, so only its first ``page * size``
+        entries from the requested end can land on the page; those are
+        merged and sliced, costing O(weeks x page x size).
+        """
+        need = page * size
+        positions, keys = [], []
+        for run_keys, run_positions in self._runs(weeks):
+            take = slice(max(0, len(run_keys) - need), None) if newest_first else slice(0, need)
+            positions.append(run_positions[take])
+            keys.append(run_keys[take])
+        if not positions:
+            return self.frame.iloc[:0]
+        positions = np.concatenate(positions)
+        merged = np.argsort(np.concatenate(keys), kind="stable")
+        if newest_first:
+            merged = merged[::-1]
+        return self.frame.iloc[positions[merged[need - size:need]]]
+
+    def positions(self, weeks, newest_first=True):
+        """Row positions of every entry in ``weeks``, in the same order as ``page``."""
+        runs = self._runs(weeks)
+        if not runs:
+            return np.empty(0, dtype=np.int64)
+        keys, positions = (np.concatenate(parts) for parts in zip(*runs))
+        order = np.argsort(keys, kind="stable")
+        return positions[order[::-1] if newest_first else order]
+
+    def _runs(self, weeks):
+        return [self.weeks.run(w) for w in sorted(set(weeks)) if w in self.weeks.runs]
@@ -0,0 +1,83 @@
+"""Registry of monitored projects.
+
+The built-in project is defined in app.py; more can be listed in a JSON file
+(``projects.json`` next to the app, or the path in ``DASHBOARD_PROJECTS``)::
+
+    [{"key": "inventory", "name": "Inventory System", "start": "2026-02-02",
+      "log_url": "https://.../pub?gid=0&single=true&output=csv",
+      "baseline": [{"document": "Project Charter", "phase": "Inisiasi",
+                    "pic_role": "PM", "target_week": 1, "start_week": 1,
+                    "budget": 40000}, ...],
+      "cost_url": "https://.../pub?gid=1&single=true&output=csv",
+      "risk_url": "https://.../pub?gid=2&single=true&output=csv"}]
+
+``budget``/``start_week`` and ``cost_url`` are optional and feed the EVM
+engine (see ``dashboard.evm``); without a cost log, AC is read from a
+``cost`` column in the activity log if there is one. ``risk_url`` is an
+optional risk log (see ``dashboard.risks``); without it the app's built-in
+register is shown. Tabs of the log's own spreadsheet can be given by gid
+instead (``"cost_gid": 1``, ``"risk_gid": 2``), and are fetched together
+(see ``dashboard.sources``).
+
+Each project gets its own partition under the cache directory, so its log
+store, snapshot and derived caches never touch another project's data.
+"""
+import json
+import os
+from collections import namedtuple
+from datetime import date
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PROJECTS_FILE = os.environ.get("DASHBOARD_PROJECTS", "projects.json")
+
+Project = namedtuple("Project", ["key", "name", "start", "log_url", "baseline", "cost_url", "risk_url"],
+                     defaults=(None, None))
+
+
+def project_dir(key):
+    # Imported here so the registry (read before the first paint) doesn't pull in pandas.
+    from dashboard.logstore import CACHE_DIR
+
+    return os.path.join(CACHE_DIR, "projects", key)
+
+
+def baseline_documents(project):
+    """Distinct baseline documents in baseline order."""
+    return list(dict.fromkeys(entry["document"] for entry in project.baseline))
+
+
+def sheet_url(url, gid):
+    """``url`` (a published sheet's CSV link) pointed at the tab ``gid``."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query["gid"] = str(gid)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _tab_url(entry, name):
+    if entry.get(f"{name}_url"):
+        return entry[f"{name}_url"]
+    if entry.get(f"{name}_gid") is not None:
+        return sheet_url(entry["log_url"], entry[f"{name}_gid"])
+    return None
+
+
+def load_registry(default, path=PROJECTS_FILE):
+    registry = {default.key: default}
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return registry
+    for entry in entries:
+        project = Project(
+            key=entry["key"],
+            name=entry.get("name", entry["key"]),
+            start=date.fromisoformat(entry["start"]),
+            log_url=entry["log_url"],
+            baseline=entry["baseline"],
+            cost_url=_tab_url(entry, "cost"),
+            risk_url=_tab_url(entry, "risk"),
+        )
+        registry[project.key] = project
+    return registry
@@ -0,0 +1,87 @@
+"""Background polling of a LogStore with stale-while-revalidate reads."""
+import threading
+import time
+from collections import namedtuple
+
+from dashboard.history import HistoryView
+from dashboard.logstore import WeekView
+
+LogSnapshot = namedtuple("LogSnapshot", ["frame", "version", "latest", "weeks", "history", "checked_at", "error"])
+
+
+class Refresher:
+    """Polls ``store.refresh()`` on a daemon thread and publishes immutable snapshots.
+
+    Readers only ever look at ``self.snapshot``, which is swapped in a single
+    assignment, so a rerun never waits on the network once a first snapshot
+    exists. A failed poll keeps serving the previous snapshot with ``error``
+    set. Frames in a snapshot are shared between sessions and must not be
+    mutated.
+
+    With ``idle_timeout`` set, a refresher nobody has read from for that long
+    stops polling and lets the store drop its in-memory frame; the next
+    ``get`` maps it back from disk and resumes polling.
+    """
+
+    def __init__(self, store, interval=60, idle_timeout=None):
+        self.store = store
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.last_read = time.monotonic()
+        self.snapshot = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        if store.frame is not None:
+            self._publish(checked_at=None)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def poll_now(self):
+        self._wake.set()
+
+    def get(self, timeout=None):
+        self.last_read = time.monotonic()
+        if self.snapshot is None:
+            self._wake.set()
+            self._ready.wait(timeout)
+        return self.snapshot
+
+    def _run(self):
+        while True:
+            if self.idle_timeout and time.monotonic() - self.last_read > self.idle_timeout:
+                self._ready.clear()
+                self.snapshot = None
+                self.store.release()
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self.poll()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def poll(self):
+        try:
+            self.store.refresh()
+        except Exception as e:
+            previous = self.snapshot
+            if previous is not None:
+                self.snapshot = previous._replace(error=e)
+            elif self.store.frame is not None:
+                # E.g. after an idle release: refresh() mapped the saved copy back before the fetch failed.
+                frame, version, latest, weeks, history = self.store.view()
+                self.snapshot = LogSnapshot(frame, version, latest, weeks, history, None, e)
+            else:
+                self.snapshot = LogSnapshot(None, self.store.version, {}, WeekView(), HistoryView(), None, e)
+            self._ready.set()
+            return
+        self._publish(checked_at=time.time())
+
+    def _publish(self, checked_at):
+        frame, version, latest, weeks, history = self.store.view()
+        self.snapshot = LogSnapshot(frame, version, latest, weeks, history, checked_at, None)
+        self._ready.set()
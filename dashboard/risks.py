@@ -0,0 +1,212 @@
+"""Risk register kept as a log of risk events, scored and counted incrementally.
+
+A risk log has one row per change to a risk (``ID``, ``Risiko``,
+``Probabilitas``, ``Dampak``, ``Strategi``, ``Status``); the last row for an
+``ID`` is its current state, so a status change is just another row.
+Levels map to codes Rendah=1, Sedang=2, Tinggi=3; a risk's score is
+probability x impact and its exposure is ``LIKELIHOOD[probability] x impact``.
+
+``RiskRegister`` keeps each risk's codes plus running totals: counts per
+status and strategy, the probability x impact matrix of open risks, the
+number of high scores and the open exposure. A delta subtracts the changed
+risks' previous contribution and adds the new one, so an update costs the
+size of the delta, not of the register.
+"""
+import functools
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+LEVELS = ["Rendah", "Sedang", "Tinggi"]
+LEVEL_CODES = {"rendah": 1, "low": 1, "sedang": 2, "medium": 2, "tinggi": 3, "high": 3}
+# Chance of a risk occurring, by probability code (0 = unknown level).
+LIKELIHOOD = np.array([0.0, 0.1, 0.5, 0.9])
+HIGH_SCORE = 6
+OPEN_STATUS = "Open"
+# Deltas are kept as separate frames until there are this many.
+MAX_FRAGMENTS = 32
+
+RISK_COLUMNS = ["ID", "Risiko", "Probabilitas", "Dampak", "Strategi", "Status"]
+RISK_RENAME_MAP = {**{c.lower(): c for c in RISK_COLUMNS},
+                   "risk": "Risiko", "probability": "Probabilitas", "impact": "Dampak", "strategy": "Strategi"}
+
+RiskSummary = namedtuple("RiskSummary", ["total", "open", "mitigated", "high_score", "exposure", "status_count",
+                                         "strategy_count", "matrix"])
+
+
+def normalize_risks(df):
+    """Risk log with canonical column names and stripped text, in log order."""
+    df = df.set_axis([RISK_RENAME_MAP.get(c.strip().lower(), c.strip()) for c in df.columns], axis=1)
+    missing = {"ID", "Probabilitas", "Dampak", "Status"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    df = df.reindex(columns=RISK_COLUMNS + [c for c in df.columns if c not in RISK_COLUMNS])
+    for col in RISK_COLUMNS:
+        df[col] = df[col].fillna("").astype(str).str.strip()
+    return df[df["ID"] != ""].reset_index(drop=True)
+
+
+def parse_risks(f):
+    """Read a risk log from a CSV file object."""
+    return normalize_risks(pd.read_csv(f, dtype=str))
+
+
+def level_codes(values):
+    """Level codes (1..3) of a Series of level names; unknown levels are 0."""
+    return values.str.lower().map(LEVEL_CODES).fillna(0).to_numpy(dtype=np.int64)
+
+
+class _Vocabulary:
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def encode(self, values):
+        codes, uniques = pd.factorize(values.to_numpy(dtype=object))
+        mapping = np.fromiter((self._code(v) for v in uniques), dtype=np.int64, count=len(uniques))
+        return mapping[codes]
+
+    def _code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+
+def _row_key(df, i):
+    return tuple(df[c].iat[i] for c in RISK_COLUMNS)
+
+
+def _grow(array, n, fill=0):
+    if len(array) >= n:
+        return array
+    return np.concatenate([array, np.full(n - len(array), fill, dtype=array.dtype)])
+
+
+class RiskRegister:
+    """Current state of every risk in a risk log, fed one delta at a time.
+
+    ``sync(frame)`` takes the whole (append-only) risk log and only applies
+    rows it hasn't seen; a log that was rewritten rather than appended to
+    is replayed from scratch. A sync that applies nothing returns the
+    previous view, so callers needn't cache it. Safe to share between sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.rows = 0
+        self._last = None
+        self._view_cache = None
+        self._frames = []
+        self._ids = _Vocabulary()
+        self._statuses = _Vocabulary()
+        self._strategies = _Vocabulary()
+        self._prob = np.zeros(0, dtype=np.int64)
+        self._impact = np.zeros(0, dtype=np.int64)
+        self._status = np.zeros(0, dtype=np.int64)
+        self._strategy = np.zeros(0, dtype=np.int64)
+        self._row = np.zeros(0, dtype=np.int64)
+        self._status_count = np.zeros(0, dtype=np.int64)
+        self._strategy_count = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((len(LEVELS), len(LEVELS)), dtype=np.int64)
+        self._high = 0
+        self._exposure = 0.0
+
+    def sync(self, frame):
+        """Bring the register up to ``frame`` (the full risk log) and return a ``RiskView``."""
+        with self._lock:
+            if len(frame) < self.rows or (self.rows and _row_key(frame, self.rows - 1) != self._last):
+                self._reset()
+            self._update(frame.iloc[self.rows:])
+            if self._view_cache is None:
+                self._view_cache = self._view()
+            return self._view_cache
+
+    def _update(self, delta):
+        if not len(delta):
+            return
+        slots = self._ids.encode(delta["ID"])
+        # Last row per risk within the delta.
+        reverse = slots[::-1]
+        slots, first = np.unique(reverse, return_index=True)
+        pick = len(delta) - 1 - first
+        n = len(self._ids.names)
+        self._prob, self._impact, self._strategy, self._row = (
+            _grow(a, n) for a in (self._prob, self._impact, self._strategy, self._row))
+        self._status = _grow(self._status, n, fill=-1)
+
+        seen = slots[self._status[slots] >= 0]
+        self._apply(seen, -1)
+        rows = delta.iloc[pick]
+        self._prob[slots] = level_codes(rows["Probabilitas"])
+        self._impact[slots] = level_codes(rows["Dampak"])
+        self._status[slots] = self._statuses.encode(rows["Status"])
+        self._strategy[slots] = self._strategies.encode(rows["Strategi"])
+        self._row[slots] = self.rows + pick
+        self._status_count = _grow(self._status_count, len(self._statuses.names))
+        self._strategy_count = _grow(self._strategy_count, len(self._strategies.names))
+        self._apply(slots, 1)
+
+        self._frames.append(delta)
+        self._view_cache = None
+        self.rows += len(delta)
+        self._last = _row_key(delta, len(delta) - 1)
+
+    def _apply(self, slots, sign):
+        """Add (sign=1) or remove (sign=-1) the contribution of risks ``slots``."""
+        if not len(slots):
+            return
+        prob, impact, status = self._prob[slots], self._impact[slots], self._status[slots]
+        np.add.at(self._status_count, status, sign)
+        np.add.at(self._strategy_count, self._strategy[slots], sign)
+        self._high += sign * int((prob * impact >= HIGH_SCORE).sum())
+        is_open = (status == self._statuses.codes.get(OPEN_STATUS, -1)) & (prob > 0) & (impact > 0)
+        np.add.at(self._matrix, (prob[is_open] - 1, impact[is_open] - 1), sign)
+        self._exposure += sign * float((LIKELIHOOD[prob[is_open]] * impact[is_open]).sum())
+
+    def _view(self):
+        if len(self._frames) > MAX_FRAGMENTS:
+            self._frames = [pd.concat(self._frames)]
+        statuses = pd.Series(self._status_count, index=self._statuses.names, name="count")
+        strategies = pd.Series(self._strategy_count, index=self._strategies.names, name="count")
+        summary = RiskSummary(
+            total=len(self._ids.names),
+            open=int(statuses.get(OPEN_STATUS, 0)),
+            mitigated=int(statuses.get("Mitigated", 0)),
+            high_score=self._high,
+            exposure=self._exposure,
+            status_count=statuses[statuses > 0].sort_values(ascending=False, kind="stable"),
+            strategy_count=strategies[strategies > 0].sort_values(ascending=False, kind="stable"),
+            matrix=self._matrix.copy(),
+        )
+        return RiskView(summary, tuple(self._frames), self._row.copy(), self._prob.copy(), self._impact.copy())
+
+
+class RiskView:
+    """Immutable snapshot of a ``RiskRegister``; the table is built on first use."""
+
+    def __init__(self, summary, frames, rows, prob, impact):
+        self.summary = summary
+        self._frames = frames
+        self._rows = rows
+        self._prob = prob
+        self._impact = impact
+
+    @functools.cached_property
+    def table(self):
+        """Current row of every risk with ``Skor`` and ``Exposure``, highest score first."""
+        if not self._frames:
+            return pd.DataFrame(columns=RISK_COLUMNS[:4] + ["Skor", "Exposure"] + RISK_COLUMNS[4:])
+        frame = self._frames[0] if len(self._frames) == 1 else pd.concat(self._frames)
+        df = frame.iloc[self._rows][RISK_COLUMNS].reset_index(drop=True)
+        score = self._prob * self._impact
+        df.insert(4, "Skor", score)
+        df.insert(5, "Exposure", np.round(LIKELIHOOD[self._prob] * self._impact, 2))
+        order = np.argsort(-score, kind="stable")
+        return df.iloc[order].reset_index(drop=True)
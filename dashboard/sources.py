@@ -0,0 +1,167 @@
+"""Concurrent fetching of a project's side sheets, each within its own timeout.
+
+A ``SourceSet`` holds named sources (a project's cost and risk tabs, say)
+and a parser for each. ``refresh()`` fetches them all at once under
+asyncio: each blocking fetch runs on the set's pool of ``concurrency``
+worker threads and is given up on after its timeout. It returns
+whatever arrived in time; a source that timed out or failed keeps its last
+good value, marked stale with the time it was fetched, so one slow tab
+degrades to an older copy instead of blanking the dashboard.
+
+Fetches are conditional: an unchanged sheet answers 304 and its value is
+kept (and counted as fresh). A source's validators are only updated once
+its body has been parsed, so a sheet that failed to parse is fetched in
+full again rather than revalidated as unchanged. A fetch given up on keeps
+running and lands in the set when it finishes; until then, later refreshes
+wait on that same fetch instead of queueing another request to a slow tab.
+
+``start`` runs ``refresh`` every ``interval`` seconds on a daemon thread,
+like ``Refresher`` does for the log, and ``get`` reads the latest results
+without waiting on the network once there are some.
+"""
+import asyncio
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard.fetch import open_source
+
+SOURCE_TIMEOUT = 10.0
+SOURCE_CONCURRENCY = 4
+
+# ``fetched_at``: when the value was last confirmed current; ``updated_at``: when it last changed.
+SourceResult = namedtuple("SourceResult", ["name", "value", "fetched_at", "updated_at", "stale", "error", "elapsed"])
+
+
+class SourceSet:
+    """Named sources fetched together; see the module docstring.
+
+    ``sources`` maps a name to its URL (or local path), ``parsers`` a name to
+    a function reading the value from a binary file object. ``timeout`` is
+    seconds, or a dict of seconds per name. Safe to share between sessions.
+    """
+
+    def __init__(self, sources, parsers, timeout=SOURCE_TIMEOUT, concurrency=SOURCE_CONCURRENCY):
+        self.timeouts = {name: timeout.get(name, SOURCE_TIMEOUT) if isinstance(timeout, dict) else timeout
+                         for name in sources}
+        self._parsers = parsers
+        self._sources = {name: open_source(url) for name, url in sources.items()}
+        # Not the loop's default executor: asyncio.run() would wait for fetches given up on.
+        self._pool = ThreadPoolExecutor(concurrency, thread_name_prefix="sources")
+        self._pending = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self.interval = None
+        self.idle_timeout = None
+        self.last_read = time.monotonic()
+        self.results = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, interval, idle_timeout=None):
+        """Refresh every ``interval`` seconds on a daemon thread; pausing after
+        ``idle_timeout`` seconds without a ``get`` (and forgetting the results), until the next one."""
+        if self._thread is None:
+            self.interval, self.idle_timeout = interval, idle_timeout
+            self._thread = threading.Thread(target=self._run, name="sources-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self, timeout=None):
+        """Latest ``{name: SourceResult}``, waiting up to ``timeout`` for the first refresh
+        (None if it isn't in yet). Without ``start``, refreshes in the caller."""
+        if self._thread is None:
+            return self.refresh()
+        self.last_read = time.monotonic()
+        if self.results is None:
+            self._wake.set()
+            self._ready.wait(timeout)
+        return self.results
+
+    def _run(self):
+        while True:
+            if self.idle_timeout and time.monotonic() - self.last_read > self.idle_timeout:
+                # As Refresher does: drop the results, so the next ``get`` wakes us and waits for fresh ones.
+                with self._lock:
+                    self.results = None
+                self._ready.clear()
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            results = self.refresh()
+            with self._lock:
+                self.results = self._landed(results)
+            self._ready.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Fetch every source concurrently; returns ``{name: SourceResult}``."""
+        return asyncio.run(self.refresh_async())
+
+    async def refresh_async(self):
+        results = await asyncio.gather(*(self._refresh_one(name) for name in self._sources))
+        return dict(zip(self._sources, results))
+
+    async def _refresh_one(self, name):
+        started = time.perf_counter()
+        try:
+            fetch = asyncio.shield(asyncio.wrap_future(self._submit(name)))
+            value, fetched_at, updated_at = await asyncio.wait_for(fetch, self.timeouts[name])
+            return SourceResult(name, value, fetched_at, updated_at, False, None, time.perf_counter() - started)
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                e = TimeoutError(f"no response within {self.timeouts[name]:g}s")
+            with self._lock:
+                value, fetched_at, updated_at = self._last.get(name, (None, None, None))
+            return SourceResult(name, value, fetched_at, updated_at, True, e, time.perf_counter() - started)
+
+    def _submit(self, name):
+        # At most one fetch per source in flight: its validators and last value move together.
+        with self._lock:
+            future = self._pending.get(name)
+            if future is not None and not future.done():
+                return future
+            future = self._pending[name] = self._pool.submit(self._load, name)
+        # Outside the lock: a future that is already done runs the callback right here.
+        future.add_done_callback(self._republish)
+        return future
+
+    def _republish(self, future):
+        # A fetch the last refresh gave up on shows up in ``results`` as soon as it lands.
+        with self._lock:
+            if self.results is not None:
+                self.results = self._landed(self.results)
+
+    def _landed(self, results):
+        """``results`` with stale entries replaced by fetches that have since succeeded."""
+        results = dict(results)
+        for name, result in results.items():
+            future = self._pending.get(name)
+            if result.stale and future is not None and future.done() and future.exception() is None:
+                value, fetched_at, updated_at = future.result()
+                results[name] = result._replace(value=value, fetched_at=fetched_at, updated_at=updated_at,
+                                                stale=False, error=None)
+        return results
+
+    def _load(self, name):
+        source = self._sources[name]
+        result = source.fetch()
+        fetched_at = time.time()
+        with self._lock:
+            previous = self._last.get(name)
+        if result.changed or previous is None:
+            if result.body is None:
+                result = source.fetch(conditional=False)
+            with result.body as body:
+                value = self._parsers[name](body)
+            updated_at = fetched_at
+        else:
+            value, _, updated_at = previous
+        with self._lock:
+            self._last[name] = (value, fetched_at, updated_at)
+        # Only now: a body that failed to parse must not be revalidated as unchanged.
+        source.validators = result.validators
+        return value, fetched_at, updated_at
@@ -0,0 +1,108 @@
+"""Stage timings for the dashboard's hot paths.
+
+Off unless ``DASHBOARD_PROFILE=1``; ``stage`` then returns a shared no-op
+context manager, so instrumented code pays one function call per stage.
+When on, each stage keeps the last ``WINDOW`` durations for rolling
+percentiles, and ``log_summary`` writes them as one JSON log line at most
+every ``LOG_INTERVAL`` seconds. Benchmarks that want every duration opt in
+with ``collect`` and read them back with ``drain``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+
+ENABLED = os.environ.get("DASHBOARD_PROFILE") == "1"
+WINDOW = int(os.environ.get("DASHBOARD_PROFILE_WINDOW", "500"))
+LOG_INTERVAL = float(os.environ.get("DASHBOARD_PROFILE_LOG_INTERVAL", "60"))
+PERCENTILES = (50, 95, 99)
+
+logger = logging.getLogger(__name__)
+if ENABLED and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+_NULL = nullcontext()
+_samples = None
+_windows = defaultdict(lambda: deque(maxlen=WINDOW))
+_lock = threading.Lock()
+_last_log = time.monotonic()
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def stage(name):
+    return _Stage(name) if ENABLED else _NULL
+
+
+def record(name, seconds):
+    with _lock:
+        _windows[name].append(seconds)
+        if _samples is not None:
+            _samples[name].append(seconds)
+
+
+def collect():
+    """Also keep every duration until ``drain`` takes it; unbounded, so not for the app."""
+    global _samples
+    with _lock:
+        if _samples is None:
+            _samples = defaultdict(list)
+
+
+def drain():
+    """Return and clear the durations recorded since the last call (empty unless collecting)."""
+    with _lock:
+        samples = dict(_samples or {})
+        if _samples is not None:
+            _samples.clear()
+    return samples
+
+
+def _percentile(ordered, p):
+    # Nearest-rank on an already sorted window.
+    return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+
+
+def summary():
+    """Rolling count/last/p50/p95/p99 per stage, in milliseconds."""
+    with _lock:
+        windows = {name: list(window) for name, window in _windows.items()}
+    rows = []
+    for name in sorted(windows):
+        ordered = sorted(windows[name])
+        row = {"stage": name, "count": len(ordered), "last_ms": windows[name][-1] * 1000}
+        for p in PERCENTILES:
+            row[f"p{p}_ms"] = _percentile(ordered, p) * 1000
+        rows.append(row)
+    return rows
+
+
+def log_summary(force=False):
+    """Log ``summary()`` as a ``perf {json}`` line if the interval has passed."""
+    global _last_log
+    if not ENABLED:
+        return False
+    now = time.monotonic()
+    with _lock:
+        if not force and now - _last_log < LOG_INTERVAL:
+            return False
+        _last_log = now
+    logger.info("perf %s", json.dumps({"at": time.time(), "window": WINDOW, "stages": summary()}))
+    return True